@@ -0,0 +1,201 @@
+"""baseline
+
+The schema as `init_db` used to leave it with `create_all`. Databases
+created that way (tables but no alembic_version) are brought up to this
+revision in place: the columns `init_db` added with ALTERs are added, and
+the tables and indexes they lack are created.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 10:59:01.213676
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_table(name: str, *elements) -> None:
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *elements)
+
+
+def create_index(name: str, table: str, columns: Sequence[str], unique: bool = False) -> None:
+    if name not in {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def adopt_existing_schema() -> None:
+    """
+    The ALTERs `init_db` ran on every boot: create_all does not add columns
+    to existing tables.
+    """
+    from app.core.security import DEFAULT_PASSWORD, verify_password
+
+    for table in ("transaction", "account", "category"):
+        op.execute(
+            f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP '
+            f"DEFAULT (now() AT TIME ZONE 'utc')"
+        )
+        op.execute(f'CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON "{table}" (updated_at)')
+
+    # Backfill is_default_password for users created before the column existed
+    connection = op.get_bind()
+    op.execute('ALTER TABLE "user" ADD COLUMN IF NOT EXISTS is_default_password BOOLEAN')
+    result = connection.execute(sa.text('SELECT id, hashed_password FROM "user" WHERE is_default_password IS NULL'))
+    for user_id, hashed_password in result.all():
+        connection.execute(
+            sa.text('UPDATE "user" SET is_default_password = :flag WHERE id = :id'),
+            {"flag": verify_password(DEFAULT_PASSWORD, hashed_password), "id": user_id},
+        )
+    op.execute('ALTER TABLE "user" ALTER COLUMN is_default_password SET NOT NULL')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("user"):
+        adopt_existing_schema()
+
+    # Tables and indexes a `create_all` database already has are skipped
+    # ### commands auto generated by Alembic - please adjust! ###
+    create_table('cache_version',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    create_table('category',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index(op.f('ix_category_name'), 'category', ['name'], unique=True)
+    create_index(op.f('ix_category_updated_at'), 'category', ['updated_at'], unique=False)
+    create_table('tombstone',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('entity', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('entity_id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index(op.f('ix_tombstone_deleted_at'), 'tombstone', ['deleted_at'], unique=False)
+    create_index(op.f('ix_tombstone_entity'), 'tombstone', ['entity'], unique=False)
+    create_index(op.f('ix_tombstone_user_id'), 'tombstone', ['user_id'], unique=False)
+    create_table('user',
+    sa.Column('username', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('permission', sa.Enum('ADMIN', 'EDITOR', 'READONLY', name='userrole'), nullable=False),
+    sa.Column('label', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('hashed_password', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('is_default_password', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index(op.f('ix_user_email'), 'user', ['email'], unique=True)
+    create_index(op.f('ix_user_username'), 'user', ['username'], unique=True)
+    create_table('account',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('account_number', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('bank_name', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('initial_balance', sa.Numeric(), nullable=False),
+    sa.Column('balance_date', sa.Date(), nullable=False),
+    sa.Column('currency', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=True),
+    sa.Column('category_id', sa.Uuid(), nullable=True),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index(op.f('ix_account_updated_at'), 'account', ['updated_at'], unique=False)
+    create_table('refresh_token',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('token_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index(op.f('ix_refresh_token_revoked_at'), 'refresh_token', ['revoked_at'], unique=False)
+    create_index(op.f('ix_refresh_token_token_hash'), 'refresh_token', ['token_hash'], unique=True)
+    create_index(op.f('ix_refresh_token_user_id'), 'refresh_token', ['user_id'], unique=False)
+    create_table('rule',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('field', sa.Enum('NAME', 'PAYEE', name='rulefield'), nullable=False),
+    sa.Column('match_type', sa.Enum('SUBSTRING', 'REGEX', name='rulematchtype'), nullable=False),
+    sa.Column('pattern', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('min_amount', sa.Numeric(), nullable=True),
+    sa.Column('max_amount', sa.Numeric(), nullable=True),
+    sa.Column('category_id', sa.Uuid(), nullable=True),
+    sa.Column('target_account_id', sa.Uuid(), nullable=True),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.ForeignKeyConstraint(['target_account_id'], ['account.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index(op.f('ix_rule_user_id'), 'rule', ['user_id'], unique=False)
+    create_table('transaction',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('type', sa.Enum('expense', 'income', 'transfer', 'withdraw', name='transactiontype'), nullable=True),
+    sa.Column('amount', sa.Numeric(), nullable=False),
+    sa.Column('target_account_id', sa.Uuid(), nullable=True),
+    sa.Column('account_id', sa.Uuid(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('recurrency', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('category_id', sa.Uuid(), nullable=True),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['account_id'], ['account.id'], ),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.ForeignKeyConstraint(['target_account_id'], ['account.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index(op.f('ix_transaction_updated_at'), 'transaction', ['updated_at'], unique=False)
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index(op.f('ix_transaction_updated_at'), table_name='transaction')
+    op.drop_table('transaction')
+    op.drop_index(op.f('ix_rule_user_id'), table_name='rule')
+    op.drop_table('rule')
+    op.drop_index(op.f('ix_refresh_token_user_id'), table_name='refresh_token')
+    op.drop_index(op.f('ix_refresh_token_token_hash'), table_name='refresh_token')
+    op.drop_index(op.f('ix_refresh_token_revoked_at'), table_name='refresh_token')
+    op.drop_table('refresh_token')
+    op.drop_index(op.f('ix_account_updated_at'), table_name='account')
+    op.drop_table('account')
+    op.drop_index(op.f('ix_user_username'), table_name='user')
+    op.drop_index(op.f('ix_user_email'), table_name='user')
+    op.drop_table('user')
+    op.drop_index(op.f('ix_tombstone_user_id'), table_name='tombstone')
+    op.drop_index(op.f('ix_tombstone_entity'), table_name='tombstone')
+    op.drop_index(op.f('ix_tombstone_deleted_at'), table_name='tombstone')
+    op.drop_table('tombstone')
+    op.drop_index(op.f('ix_category_updated_at'), table_name='category')
+    op.drop_index(op.f('ix_category_name'), table_name='category')
+    op.drop_table('category')
+    op.drop_table('cache_version')
+    # ### end Alembic commands ###
+    for enum in ("transactiontype", "rulematchtype", "rulefield", "userrole"):
+        op.execute(f"DROP TYPE IF EXISTS {enum}")
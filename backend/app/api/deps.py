@@ -1,26 +1,98 @@
-from typing import Generator, AsyncGenerator
-from fastapi import Depends, HTTPException, status
+from typing import Generator, AsyncGenerator, Optional
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import security
+from app.core.admission import limiters, route_class
 from app.core.config import settings
-from app.db.session import get_session
+from app.core.principal_cache import principal_cache
+from app.db import statements
+from app.db.session import async_session, get_session, get_read_session, set_statement_timeout
 from app.models import User
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/login/access-token", auto_error=False
+)
+
+def route_statement_timeout(request: Request) -> Optional[int]:
+    """
+    The `DB_ROUTE_STATEMENT_TIMEOUTS_MS` entry for this route: the longest
+    prefix of its path template.
+    """
+    timeouts = settings.DB_ROUTE_STATEMENT_TIMEOUTS_MS
+    if not timeouts:
+        return None
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    matches = [prefix for prefix in timeouts if path.startswith(prefix)]
+    return timeouts[max(matches, key=len)] if matches else None
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     async for session in get_session():
+        timeout_ms = route_statement_timeout(request)
+        if timeout_ms is not None:
+            set_statement_timeout(session, timeout_ms)
         yield session
 
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints, served by the read replica when one is
+    configured. Clients that must see their own latest writes send
+    `X-Read-Your-Writes: true` to read from the primary instead.
+    """
+    if request.headers.get("X-Read-Your-Writes", "").lower() in ("1", "true", "yes"):
+        sessions = get_session()
+    else:
+        sessions = get_read_session()
+    async for session in sessions:
+        timeout_ms = route_statement_timeout(request)
+        if timeout_ms is not None:
+            set_statement_timeout(session, timeout_ms)
+        yield session
+
+def token_subject(token: str) -> Optional[str]:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except (JWTError, ValidationError):
+        return None
+    return payload.get("sub")
+
+async def admit_request(
+    request: Request, token: str = Depends(reusable_oauth2)
+) -> AsyncGenerator[None, None]:
+    """
+    Admission control (app/core/admission.py), keyed by the token's user.
+    Runs before any other dependency, so a request waiting for a slot holds
+    no database session or connection.
+    """
+    if not settings.ADMISSION_ENABLED:
+        yield
+        return
+
+    user = principal_cache.get(token)
+    user_key = str(user.id) if user is not None else token_subject(token)
+    if user_key is None:
+        # Bad token: get_current_user turns it away
+        yield
+        return
+
+    limiter = limiters[route_class(request.method, request.scope["route"].path)]
+    async with limiter.admit(user_key):
+        yield
+
 async def get_current_user(
-    db: AsyncSession = Depends(get_db),
     token: str = Depends(reusable_oauth2)
 ) -> User:
+    # Recently verified token: no decode, no database round trip
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -33,16 +105,36 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # In a real app, you would fetch the user from DB.
-    # Since we are using async, we need to execute a query.
-    from sqlmodel import select
-    result = await db.execute(select(User).where(User.id == token_data))
-    user = result.scalars().first()
+    # Its own short-lived primary session, closed before the handler runs: a
+    # request never holds a second connection for authentication, and the
+    # lookup never reads a lagging replica
+    async with async_session() as db:
+        result = await db.execute(statements.USER_BY_ID, {"user_id": token_data})
+        user = result.scalars().first()
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+
+    principal_cache.set(token, user, token_expires_at=payload.get("exp"))
     return user
 
+async def get_event_stream_user(
+    token: Optional[str] = Depends(optional_oauth2),
+    access_token: Optional[str] = Query(None),
+) -> User:
+    """
+    The user of a long-lived stream. Browsers' EventSource cannot send
+    headers, so the token may also come as `?access_token=`.
+    """
+    token = token or access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(token=token)
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -0,0 +1,62 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Sequence, Type
+from uuid import UUID
+
+import orjson
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy.engine import Row
+from sqlmodel import SQLModel
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+def serialize(tp: Any, content: Any) -> Response:
+    """
+    Validate `content` (ORM objects or dicts) against `tp` once, through a
+    cached TypeAdapter, and encode it in the same pass.
+
+    Endpoints returning this skip FastAPI's own `response_model` validation
+    and encoding; keep `response_model` on the route for the OpenAPI schema.
+    """
+    adapter = type_adapter(tp)
+    return Response(
+        adapter.dump_json(adapter.validate_python(content, from_attributes=True)),
+        media_type="application/json",
+    )
+
+def serialize_list(model: Type[SQLModel], items: Any) -> Response:
+    return serialize(List[model], items)
+
+def read_columns(read_model: Type[SQLModel], table: Type[SQLModel]) -> list:
+    """
+    The table columns backing the fields of a read model, in field order, so
+    a query can select plain rows instead of building ORM instances.
+    """
+    columns = table.__table__.columns
+    return [getattr(table, name) for name in read_model.model_fields if name in columns]
+
+def row_dicts(rows: Sequence[Row]) -> List[dict]:
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
+
+def _default(value: Any) -> Any:
+    # orjson handles UUID itself, but not asyncpg's UUID subclass
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def json_response(content: Any) -> Response:
+    """
+    Encode already well-typed data with ORJSON, skipping validation: the fast
+    path for rows selected with `read_columns`, whose values come straight
+    from columns of the read model's types.
+    """
+    return Response(orjson.dumps(content, default=_default), media_type="application/json")
+
+def rows_response(rows: Sequence[Row]) -> Response:
+    return json_response(row_dicts(rows))
@@ -1,12 +1,20 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import login, users, accounts, transactions, categories, reports, export, import_data
+from fastapi import APIRouter, Depends
+from app.api import deps
+from app.api.v1.endpoints import login, users, accounts, transactions, categories, reports, export, import_data, rules, diagnostics, events
 
 api_router = APIRouter()
+
+# Every authenticated router except diagnostics, which must answer under load,
+# and events, whose streams stay open
+admitted = [Depends(deps.admit_request)]
 api_router.include_router(login.router, tags=["login"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(accounts.router, prefix="/accounts", tags=["accounts"])
-api_router.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
-api_router.include_router(categories.router, prefix="/categories", tags=["categories"])
-api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
-api_router.include_router(export.router, prefix="/export", tags=["export"])
-api_router.include_router(import_data.router, prefix="/import", tags=["import"])
+api_router.include_router(users.router, prefix="/users", tags=["users"], dependencies=admitted)
+api_router.include_router(accounts.router, prefix="/accounts", tags=["accounts"], dependencies=admitted)
+api_router.include_router(transactions.router, prefix="/transactions", tags=["transactions"], dependencies=admitted)
+api_router.include_router(categories.router, prefix="/categories", tags=["categories"], dependencies=admitted)
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"], dependencies=admitted)
+api_router.include_router(export.router, prefix="/export", tags=["export"], dependencies=admitted)
+api_router.include_router(import_data.router, prefix="/import", tags=["import"], dependencies=admitted)
+api_router.include_router(rules.router, prefix="/rules", tags=["rules"], dependencies=admitted)
+api_router.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
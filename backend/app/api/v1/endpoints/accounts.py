@@ -5,14 +5,19 @@ import csv
 import io
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy import func
 from sqlmodel import select
-from datetime import date as date_type
+from datetime import date as date_type, datetime
 from decimal import Decimal
 
 from app.api import deps
+from app.api.responses import json_response, read_columns, row_dicts, rows_response, serialize_list
+from app.db import statements
 from app.models import Account, AccountCreate, AccountRead, AccountUpdate, User, Transaction, TransactionType, TransactionRead, Category
 from app.models.user import UserRole
+from app.services.account_totals import account_totals, get_account_totals
+from app.services.category_cache import category_cache
 
 router = APIRouter()
 
@@ -34,47 +39,70 @@ async def import_destination_accounts(
         decoded_content = contents.decode('utf-8')
         csv_reader = csv.DictReader(io.StringIO(decoded_content))
         
-        imported_count = 0
         errors = []
         
+        # Collect distinct names (case-insensitive), first occurrence wins
+        rows = {}
         for row in csv_reader:
-            try:
-                name = row.get('name')
-                if not name:
-                    continue
-                    
-                # Check if account exists (case-insensitive)
-                query = select(Account).where(
-                    func.lower(Account.name) == func.lower(name),
+            name = row.get('name')
+            if not name:
+                continue
+            if name.lower() in rows:
+                errors.append(f"Error importing row {row}: duplicate destination account name in file")
+                continue
+            rows[name.lower()] = row
+
+        imported_count = 0
+        if rows:
+            # Skip accounts that already exist (case-insensitive, one query)
+            result = await db.execute(
+                select(func.lower(Account.name)).where(
+                    func.lower(Account.name).in_(rows),
                     Account.user_id == None
                 )
-                result = await db.execute(query)
-                existing = result.scalars().first()
-                
-                if not existing:
-                    # Handle category if provided
-                    category_id = None
-                    category_name = row.get('category')
-                    if category_name:
-                        cat_result = await db.execute(select(Category).where(func.lower(Category.name) == func.lower(category_name)))
-                        category = cat_result.scalars().first()
-                        if category:
-                            category_id = category.id
+            )
+            for existing_name in result.scalars().all():
+                rows.pop(existing_name, None)
 
+            # Resolve referenced categories by name (case-insensitive)
+            category_map = await category_cache.name_map(db, case_insensitive=True)
+
+            now = datetime.utcnow()
+            values = []
+            for row in rows.values():
+                try:
+                    category_name = row.get('category')
                     account_in = AccountCreate(
-                        name=name,
+                        name=row['name'],
                         bank_name=row.get('bank_name', 'Unknown'),
                         account_number=row.get('account_number'),
-                        category_id=category_id,
+                        category_id=category_map.get(category_name.lower()) if category_name else None,
                         initial_balance=0,
+                        balance_date=date_type.today(),
                         currency="USD"
                     )
                     # Ensure user_id is None for destination accounts
                     account = Account.model_validate(account_in, update={"user_id": None})
-                    db.add(account)
-                    imported_count += 1
-            except Exception as e:
-                errors.append(f"Error importing row {row}: {str(e)}")
+                    values.append({
+                        "id": account.id,
+                        "name": account.name,
+                        "bank_name": account.bank_name,
+                        "account_number": account.account_number,
+                        "category_id": account.category_id,
+                        "initial_balance": account.initial_balance,
+                        "balance_date": account.balance_date,
+                        "currency": account.currency,
+                        "user_id": None,
+                        "updated_at": now,
+                    })
+                except Exception as e:
+                    errors.append(f"Error importing row {row}: {str(e)}")
+
+            if values:
+                result = await db.execute(
+                    pg_insert(Account).values(values).on_conflict_do_nothing().returning(Account.id)
+                )
+                imported_count = len(result.all())
                 
         await db.commit()
         
@@ -88,7 +116,7 @@ async def import_destination_accounts(
 
 @router.get("/destination", response_model=List[AccountRead])
 async def read_destination_accounts(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(deps.get_current_active_user),
@@ -105,8 +133,7 @@ async def read_destination_accounts(
             .limit(limit)
         )
         result = await db.execute(query)
-        accounts = result.scalars().all()
-        return accounts
+        return serialize_list(AccountRead, result.scalars().all())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -147,7 +174,7 @@ async def create_destination_account(
 
 @router.get("/", response_model=List[AccountRead])
 async def read_accounts(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(deps.get_current_active_user),
@@ -157,25 +184,23 @@ async def read_accounts(
     """
     try:
         if current_user.permission == UserRole.ADMIN:
-            query = select(Account).where(Account.user_id != None).offset(skip).limit(limit)
+            result = await db.execute(statements.ACCOUNT_PAGE, {"skip": skip, "limit": limit})
         else:
-            query = select(Account).where(Account.user_id == current_user.id).offset(skip).limit(limit)
-            
-        result = await db.execute(query)
-        accounts = result.scalars().all()
+            result = await db.execute(
+                statements.USER_ACCOUNT_PAGE, {"user_id": current_user.id, "skip": skip, "limit": limit}
+            )
+        accounts = result.all()
+
+        # Transaction totals for every account on the page: cached, the
+        # misses in one query
+        totals = {}
+        if accounts:
+            totals = await get_account_totals(db, [account.id for account in accounts])
         
-        account_reads = []
-        for account in accounts:
-            # Calculate balance for each account
-            query_sum = select(func.sum(Transaction.amount)).where(Transaction.account_id == account.id)
-            result_sum = await db.execute(query_sum)
-            total_transactions = result_sum.scalar() or Decimal(0)
-            
-            account_read = AccountRead.model_validate(account)
-            account_read.current_balance = account.initial_balance + total_transactions
-            account_reads.append(account_read)
-            
-        return account_reads
+        account_reads = row_dicts(accounts)
+        for account in account_reads:
+            account["current_balance"] = account["initial_balance"] + totals[account["id"]]
+        return json_response(account_reads)
     except HTTPException:
         raise
     except Exception as e:
@@ -208,7 +233,7 @@ async def create_account(
 @router.get("/{account_id}", response_model=AccountRead)
 async def read_account(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     account_id: UUID,
     current_user: User = Depends(deps.get_current_active_user),
     end_date: Optional[date_type] = Query(None),
@@ -308,6 +333,7 @@ async def delete_account(
             raise HTTPException(status_code=403, detail="Not enough permissions")
 
         await db.delete(account)
+        await account_totals.invalidate(db, account_id)
         await db.commit()
         return account
     except HTTPException:
@@ -318,7 +344,7 @@ async def delete_account(
 @router.get("/{account_id}/balance", response_model=Decimal)
 async def get_account_balance(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     account_id: UUID,
     target_date: date_type = Query(default_factory=date_type.today),
     current_user: User = Depends(deps.get_current_active_user),
@@ -349,13 +375,10 @@ async def get_account_balance(
             transactions = result.scalars().all()
             
             for txn in transactions:
-                print(f"Processing transaction: {txn.name}, Type: {txn.type}, Amount: {txn.amount}, Date: {txn.date}")
                 if txn.type in [TransactionType.INCOME]:
                     balance += txn.amount
-                    print(f"Added {txn.amount}. New Balance: {balance}")
                 else:
                     balance -= txn.amount
-                    print(f"Subtracted {txn.amount}. New Balance: {balance}")
         else:
             # Subtract transactions between target_date (exclusive) and balance_date (inclusive)
             # Because we are moving backwards in time from the known balance point
@@ -382,7 +405,7 @@ async def get_account_balance(
 @router.get("/{account_id}/transactions/sum", response_model=Decimal)
 async def get_account_transaction_sum(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     account_id: UUID,
     start_date: Optional[date_type] = Query(None),
     end_date: Optional[date_type] = Query(None),
@@ -427,7 +450,7 @@ async def get_account_transaction_sum(
 @router.get("/{account_id}/transactions/type", response_model=List[TransactionRead])
 async def get_account_transactions_by_type(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     account_id: UUID,
     type: TransactionType,
     start_date: Optional[date_type] = Query(None),
@@ -446,7 +469,7 @@ async def get_account_transactions_by_type(
         if account.user_id != current_user.id and current_user.permission != UserRole.ADMIN:
             raise HTTPException(status_code=403, detail="Not enough permissions")
 
-        query = select(Transaction).where(
+        query = select(*read_columns(TransactionRead, Transaction)).where(
             Transaction.account_id == account_id,
             Transaction.type == type
         )
@@ -457,8 +480,7 @@ async def get_account_transactions_by_type(
             query = query.where(Transaction.date <= end_date)
 
         result = await db.execute(query)
-        transactions = result.scalars().all()
-        return transactions
+        return rows_response(result.all())
     except HTTPException:
         raise
     except Exception as e:
@@ -467,7 +489,7 @@ async def get_account_transactions_by_type(
 @router.get("/{account_id}/transactions/type/sum", response_model=Decimal)
 async def get_account_transaction_sum_by_type(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     account_id: UUID,
     type: TransactionType,
     start_date: Optional[date_type] = Query(None),
@@ -509,7 +531,7 @@ async def get_account_transaction_sum_by_type(
 @router.get("/{account_id}/transactions/target", response_model=List[TransactionRead])
 async def get_account_transactions_by_target(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     account_id: UUID,
     target_account_id: UUID,
     start_date: Optional[date_type] = Query(None),
@@ -528,7 +550,7 @@ async def get_account_transactions_by_target(
         if account.user_id != current_user.id and current_user.permission != UserRole.ADMIN:
             raise HTTPException(status_code=403, detail="Not enough permissions")
 
-        query = select(Transaction).where(
+        query = select(*read_columns(TransactionRead, Transaction)).where(
             Transaction.account_id == account_id,
             Transaction.target_account_id == target_account_id
         )
@@ -541,8 +563,7 @@ async def get_account_transactions_by_target(
         query = query.order_by(Transaction.date.desc())
 
         result = await db.execute(query)
-        transactions = result.scalars().all()
-        return transactions
+        return rows_response(result.all())
     except HTTPException:
         raise
     except Exception as e:
@@ -551,7 +572,7 @@ async def get_account_transactions_by_target(
 @router.get("/{account_id}/transactions/target/sum", response_model=Decimal)
 async def get_account_transactions_sum_by_target(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     account_id: UUID,
     target_account_id: UUID,
     start_date: Optional[date_type] = Query(None),
@@ -1,14 +1,18 @@
 from typing import Any, List
-from uuid import UUID
+from uuid import UUID, uuid4
+from datetime import datetime
 import csv
 import io
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import select
 
 from app.api import deps
+from app.api.responses import serialize_list
 from app.models import Category, CategoryCreate, CategoryRead, CategoryUpdate, User
 from app.models.user import UserRole
+from app.services.category_cache import category_cache
 
 router = APIRouter()
 
@@ -30,29 +34,49 @@ async def import_categories(
         decoded_content = contents.decode('utf-8')
         csv_reader = csv.DictReader(io.StringIO(decoded_content))
         
-        imported_count = 0
         errors = []
         
+        # Collect distinct names, first occurrence wins
+        new_categories = {}
         for row in csv_reader:
             try:
                 name = row.get('name')
                 if not name:
                     continue
+                if name in new_categories:
+                    errors.append(f"Error importing row {row}: duplicate category name in file")
+                    continue
                     
-                # Check if category exists
-                result = await db.execute(select(Category).where(Category.name == name))
-                existing = result.scalars().first()
-                
-                if not existing:
-                    category_in = CategoryCreate(
-                        name=name,
-                        description=row.get('description')
-                    )
-                    category = Category.model_validate(category_in)
-                    db.add(category)
-                    imported_count += 1
+                category_in = CategoryCreate(
+                    name=name,
+                    description=row.get('description')
+                )
+                new_categories[name] = category_in
             except Exception as e:
                 errors.append(f"Error importing row {row}: {str(e)}")
+
+        imported_count = 0
+        if new_categories:
+            # Skip categories that already exist
+            existing_names = await category_cache.name_map(db)
+            for name in list(new_categories):
+                if name in existing_names:
+                    del new_categories[name]
+
+        if new_categories:
+            now = datetime.utcnow()
+            stmt = (
+                pg_insert(Category)
+                .values([
+                    {"id": uuid4(), "name": c.name, "description": c.description, "updated_at": now}
+                    for c in new_categories.values()
+                ])
+                .on_conflict_do_nothing(index_elements=["name"])
+                .returning(Category.id)
+            )
+            result = await db.execute(stmt)
+            imported_count = len(result.all())
+            await category_cache.invalidate(db)
                 
         await db.commit()
         
@@ -75,9 +99,8 @@ async def read_categories(
     Retrieve categories.
     """
     try:
-        result = await db.execute(select(Category).offset(skip).limit(limit))
-        categories = result.scalars().all()
-        return categories
+        categories = await category_cache.all(db)
+        return serialize_list(CategoryRead, categories[skip:skip + limit])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -103,6 +126,7 @@ async def create_category(
 
         category = Category.model_validate(category_in)
         db.add(category)
+        await category_cache.invalidate(db)
         await db.commit()
         await db.refresh(category)
         return category
@@ -144,6 +168,7 @@ async def update_category(
             setattr(category, field, value)
 
         db.add(category)
+        await category_cache.invalidate(db)
         await db.commit()
         await db.refresh(category)
         return category
@@ -169,6 +194,7 @@ async def delete_category(
             raise HTTPException(status_code=404, detail="Category not found")
 
         await db.delete(category)
+        await category_cache.invalidate(db)
         await db.commit()
         return category
     except HTTPException:
@@ -0,0 +1,67 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.core.admission import limiters
+from app.core.metrics import db_compiled_cache_total, get_process_memory
+from app.db import statements
+from app.db.session import engine, read_engine, get_compiled_cache_size, get_pool_status
+from app.models import User
+
+router = APIRouter()
+
+@router.get("/pool", response_model=dict)
+async def read_pool_status(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Connection pool usage and checkout wait statistics for this worker.
+    """
+    status = get_pool_status(engine)
+    if read_engine is not engine:
+        status["replica"] = get_pool_status(read_engine)
+    return status
+
+@router.get("/process", response_model=dict)
+async def read_process_status(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Memory usage of this worker, for spotting leaks during soak tests.
+    """
+    return get_process_memory()
+
+@router.get("/admission", response_model=dict)
+async def read_admission_status(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Admission control per route class for this worker: slots in use, queue
+    depth and rejections so far.
+    """
+    return {name: limiter.status() for name, limiter in limiters.items()}
+
+@router.get("/statements", response_model=dict)
+async def read_statement_cache_status(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    SQLAlchemy compiled-cache hits and misses for this worker, cache sizes,
+    and how many prebuilt transaction statements have been built.
+    """
+    hits = int(db_compiled_cache_total.get("hit"))
+    misses = int(db_compiled_cache_total.get("miss"))
+    entries = {"primary": get_compiled_cache_size(engine)}
+    if read_engine is not engine:
+        entries["replica"] = get_compiled_cache_size(read_engine)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "uncached": int(db_compiled_cache_total.get("uncached")),
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "entries": entries,
+        "transaction_statements": (
+            statements.transaction_page.cache_info().currsize
+            + statements.transaction_total.cache_info().currsize
+        ),
+    }
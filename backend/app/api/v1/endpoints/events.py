@@ -0,0 +1,63 @@
+from typing import Any
+import asyncio
+import time
+import orjson
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api import deps
+from app.core.config import settings
+from app.core.metrics import events_sent_total
+from app.models import User
+from app.services.account_events import event_streams
+
+router = APIRouter()
+
+def format_event(name: str, data: Any) -> str:
+    return f"event: {name}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+@router.get("/", response_class=StreamingResponse)
+async def stream_events(
+    current_user: User = Depends(deps.get_event_stream_user),
+) -> Any:
+    """
+    Server-Sent Events of balance and transaction changes to the user's
+    accounts (every account, for admins), pushed as the writes commit.
+    The stream ends after `EVENTS_STREAM_MAX_SECONDS`; clients reconnect.
+    """
+    if event_streams.full:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many open event streams",
+            headers={"Retry-After": "5"},
+        )
+
+    async def events():
+        stream = event_streams.open(current_user)
+        deadline = time.monotonic() + settings.EVENTS_STREAM_MAX_SECONDS
+        try:
+            yield "retry: 3000\n\n"
+            # Changes made before the stream opened were not sent: load the current state
+            yield format_event("resync", {})
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    message = await asyncio.wait_for(
+                        stream.queue.get(), min(settings.EVENTS_KEEPALIVE_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                events_sent_total.inc("sent")
+                yield format_event(message["event"], message["data"])
+        finally:
+            event_streams.close(stream)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
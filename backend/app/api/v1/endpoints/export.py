@@ -1,33 +1,55 @@
 from typing import Any
 import io
 import csv
+import json
 import zipfile
-from datetime import datetime
-from fastapi import APIRouter, Depends, Response
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response
 from fastapi.responses import StreamingResponse
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from app.api import deps
-from app.models import Transaction, Account, Category, User
+from app.core.config import settings
+from app.models import Transaction, Account, Category, Tombstone, User
 from app.models.user import UserRole
 
 router = APIRouter()
 
+# Time of the transaction's snapshot, by the database clock; on a replica no
+# later than the last commit it has replayed
+SNAPSHOT_TIME = text("SELECT least(now(), pg_last_xact_replay_timestamp()) AT TIME ZONE 'UTC'")
+
 @router.get("/backup", response_class=StreamingResponse)
 async def export_backup(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     current_user: User = Depends(deps.get_current_active_user),
+    since: Optional[datetime] = Query(None),
 ) -> Any:
     """
     Export all data (Accounts, Transactions, Categories) as a ZIP of CSV files.
+    When `since` is given (the watermark of a previous backup), only rows
+    created, updated or deleted after it are exported.
     """
     
+    # Every query below reads the same snapshot, taken with the watermark
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    snapshot_time = (await db.execute(SNAPSHOT_TIME)).scalar()
+    # Rows are stamped when flushed, and one flushed before the snapshot may
+    # commit after it: the next delta starts early enough to include it, and
+    # rows exported twice are simply applied twice on restore
+    watermark = snapshot_time - timedelta(seconds=settings.BACKUP_WATERMARK_MARGIN_SECONDS)
+
     # 1. Fetch Data
     
     # Categories (All)
-    categories_result = await db.execute(select(Category))
+    categories_query = select(Category)
+    if since:
+        categories_query = categories_query.where(Category.updated_at > since)
+    categories_result = await db.execute(categories_query)
     categories = categories_result.scalars().all()
     
     # Accounts (User filtered)
@@ -35,6 +57,8 @@ async def export_backup(
         accounts_query = select(Account)
     else:
         accounts_query = select(Account).where(Account.user_id == current_user.id)
+    if since:
+        accounts_query = accounts_query.where(Account.updated_at > since)
     accounts_result = await db.execute(accounts_query)
     accounts = accounts_result.scalars().all()
     
@@ -42,9 +66,22 @@ async def export_backup(
     if current_user.permission == UserRole.ADMIN:
         transactions_query = select(Transaction)
     else:
-        transactions_query = select(Transaction).join(Account).where(Account.user_id == current_user.id)
+        transactions_query = select(Transaction).join(Account, Transaction.account_id == Account.id).where(Account.user_id == current_user.id)
+    if since:
+        transactions_query = transactions_query.where(Transaction.updated_at > since)
     transactions_result = await db.execute(transactions_query)
     transactions = transactions_result.scalars().all()
+
+    # Deletions (only relevant for incremental backups)
+    tombstones = []
+    if since:
+        tombstones_query = select(Tombstone).where(Tombstone.deleted_at > since)
+        if current_user.permission != UserRole.ADMIN:
+            tombstones_query = tombstones_query.where(
+                (Tombstone.user_id == current_user.id) | (Tombstone.entity == "category")
+            )
+        tombstones_result = await db.execute(tombstones_query.order_by(Tombstone.deleted_at))
+        tombstones = tombstones_result.scalars().all()
     
     # 2. Create ZIP in memory
     zip_buffer = io.BytesIO()
@@ -94,13 +131,33 @@ async def export_backup(
             ]
         )
 
+        # Deletions
+        if since:
+            write_csv_to_zip(
+                "deleted.csv",
+                tombstones,
+                ["entity", "id", "deleted_at"],
+                lambda d: [d.entity, str(d.entity_id), d.deleted_at.isoformat()]
+            )
+
+        # Manifest used by restore to apply backups in order
+        zip_file.writestr("manifest.json", json.dumps({
+            "type": "delta" if since else "full",
+            "since": since.isoformat() if since else None,
+            "watermark": watermark.isoformat(),
+        }))
+
     # 3. Return ZIP response
     zip_buffer.seek(0)
     
-    filename = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    prefix = "backup_delta" if since else "backup"
+    filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
     
     return StreamingResponse(
         zip_buffer,
         media_type="application/zip",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Backup-Watermark": watermark.isoformat(),
+        }
     )
@@ -1,166 +1,273 @@
-from typing import Any
+from typing import Any, List, Optional
 import csv
+import json
 import zipfile
 import io
 from uuid import UUID
 from decimal import Decimal
 from datetime import date, datetime
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
 from app.api import deps
 from app.models import Transaction, Account, Category, User
 from app.models.user import UserRole
+from app.services.account_totals import account_totals
+from app.services.category_cache import category_cache
 
 router = APIRouter()
 
+# Keeps IN lists well below the Postgres bind parameter limit
+ID_CHUNK_SIZE = 5000
+
+async def _load_by_ids(db: AsyncSession, model, ids) -> dict:
+    """
+    Fetch existing rows for many ids with a few IN queries instead of one
+    lookup per row.
+    """
+    ids = list(set(ids))
+    found = {}
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        result = await db.execute(select(model).where(model.id.in_(ids[start:start + ID_CHUNK_SIZE])))
+        for obj in result.scalars().all():
+            found[obj.id] = obj
+    return found
+
+async def _apply_backup(
+    zip_ref: zipfile.ZipFile, db: AsyncSession, current_user: User
+) -> dict:
+    """
+    Apply one backup archive (full or delta) to the database without committing.
+    Returns the archive manifest and the number of rows processed per entity.
+    """
+    file_names = zip_ref.namelist()
+
+    # Helper to decode and parse CSV
+    def parse_csv(filename):
+        if filename not in file_names:
+            return []
+        with zip_ref.open(filename) as f:
+            # Read and decode
+            csv_content = io.TextIOWrapper(f, encoding="utf-8")
+            reader = csv.DictReader(csv_content)
+            return list(reader)
+
+    # Backups made before manifests existed are full backups
+    manifest = {"type": "full", "since": None, "watermark": None}
+    if "manifest.json" in file_names:
+        manifest.update(json.loads(zip_ref.read("manifest.json")))
+
+    # 1. Import Categories
+    categories_data = parse_csv("categories.csv")
+    existing_categories = await _load_by_ids(db, Category, [UUID(row["id"]) for row in categories_data])
+    for row in categories_data:
+        cat_id = UUID(row["id"])
+        category = existing_categories.get(cat_id)
+        if category:
+            category.name = row["name"]
+            category.description = row["description"] or None
+        else:
+            category = Category(
+                id=cat_id,
+                name=row["name"],
+                description=row["description"] or None
+            )
+            db.add(category)
+    
+    await db.flush() # Ensure categories exist for FKs
+
+    # 2. Import Accounts
+    accounts_data = parse_csv("accounts.csv")
+    existing_accounts = await _load_by_ids(db, Account, [UUID(row["id"]) for row in accounts_data])
+    for row in accounts_data:
+        acc_id = UUID(row["id"])
+        
+        # Determine intended user_id from CSV
+        # If "None", it's a destination account. Otherwise, assign to current user.
+        row_user_id = row.get("user_id")
+        target_user_id = current_user.id
+        if row_user_id == "None" or not row_user_id:
+            target_user_id = None
+
+        account = existing_accounts.get(acc_id)
+        
+        # Verify ownership if exists (only for non-admin)
+        # If account exists and belongs to another user, skip (unless Admin)
+        # If account is a destination account (user_id=None), regular user shouldn't update it?
+        # For now, let's strictly enforce ownership check against current user's ID
+        if account and current_user.permission != UserRole.ADMIN:
+             if account.user_id != current_user.id and account.user_id is not None:
+                 continue
+        
+        # Parse fields
+        balance_val = Decimal(row["initial_balance"])
+        # Handle balance_date being potentially missing in old backups (though we just fixed export)
+        b_date = date.fromisoformat(row.get("balance_date", date.today().isoformat()))
+        
+        if account:
+            account.name = row["name"]
+            account.account_number = row["account_number"] or None
+            account.bank_name = row["bank_name"] or None
+            account.currency = row["currency"]
+            account.initial_balance = balance_val
+            account.balance_date = b_date
+            account.user_id = target_user_id
+        else:
+            account = Account(
+                id=acc_id,
+                name=row["name"],
+                account_number=row["account_number"] or None,
+                bank_name=row["bank_name"] or None,
+                currency=row["currency"],
+                initial_balance=balance_val,
+                balance_date=b_date,
+                user_id=target_user_id
+            )
+            db.add(account)
+    
+    await db.flush()
+
+    # 3. Import Transactions
+    transactions_data = parse_csv("transactions.csv")
+    known_accounts = await _load_by_ids(db, Account, [UUID(row["account_id"]) for row in transactions_data])
+    existing_transactions = await _load_by_ids(db, Transaction, [UUID(row["id"]) for row in transactions_data])
+    for row in transactions_data:
+        trans_id = UUID(row["id"])
+        account_id = UUID(row["account_id"])
+        
+        # Check if account exists (it should, we just imported)
+        # If we skipped an account due to permission, we should skip transaction
+        if account_id not in known_accounts:
+            continue
+            
+        target_account_id = UUID(row["target_account_id"]) if row.get("target_account_id") else None
+        category_id = UUID(row["category_id"]) if row.get("category_id") else None
+        
+        amount_val = Decimal(row["amount"])
+        date_val = datetime.fromisoformat(row["date"]) # Use fromisoformat for datetime
+
+        transaction = existing_transactions.get(trans_id)
+        
+        if transaction:
+            transaction.date = date_val
+            transaction.name = row["name"]
+            transaction.type = row["type"]
+            transaction.amount = amount_val
+            transaction.account_id = account_id
+            transaction.target_account_id = target_account_id
+            transaction.category_id = category_id
+        else:
+            transaction = Transaction(
+                id=trans_id,
+                date=date_val,
+                name=row["name"],
+                type=row["type"],
+                amount=amount_val,
+                account_id=account_id,
+                target_account_id=target_account_id,
+                category_id=category_id
+            )
+            db.add(transaction)
+
+    # 4. Apply deletions (delta backups only), children first
+    deleted_data = parse_csv("deleted.csv")
+    entity_models = {"transaction": Transaction, "account": Account, "category": Category}
+    for entity in ("transaction", "account", "category"):
+        ids = [UUID(row["id"]) for row in deleted_data if row["entity"] == entity]
+        if not ids:
+            continue
+        model = entity_models[entity]
+        objs = (await _load_by_ids(db, model, ids)).values()
+        owners = {}
+        if entity == "transaction" and current_user.permission != UserRole.ADMIN:
+            owners = await _load_by_ids(db, Account, [obj.account_id for obj in objs])
+        for obj in objs:
+            if current_user.permission != UserRole.ADMIN:
+                if entity == "account" and obj.user_id != current_user.id:
+                    continue
+                if entity == "transaction":
+                    account = owners.get(obj.account_id)
+                    if account and account.user_id != current_user.id:
+                        continue
+            await db.delete(obj)
+        await db.flush()
+
+    return {
+        "manifest": manifest,
+        "counts": {
+            "categories": len(categories_data),
+            "accounts": len(accounts_data),
+            "transactions": len(transactions_data),
+            "deleted": len(deleted_data),
+        },
+    }
+
 @router.post("/restore")
 async def restore_backup(
     *,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user),
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    deltas: Optional[List[UploadFile]] = File(None),
+    watermark: Optional[str] = Form(None),
 ) -> Any:
     """
     Restore data from a backup ZIP file (categories, accounts, transactions).
     Existing IDs will be updated; new IDs will be created.
+    Incremental backups can be passed as `deltas`, in order, and are applied
+    on top of `file`. To continue a chain in a later call, upload the next
+    delta as `file` with `watermark` set to the one this call returned; a
+    delta is refused unless it starts at or before that point.
     """
-    if not file.filename.endswith(".zip"):
-        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a ZIP file.")
+    uploads = [file] + list(deltas or [])
+    for upload in uploads:
+        if not upload.filename.endswith(".zip"):
+            raise HTTPException(status_code=400, detail="Invalid file type. Please upload a ZIP file.")
+    if watermark:
+        try:
+            # Watermarks are naive UTC, as exported
+            valid = datetime.fromisoformat(watermark).tzinfo is None
+        except ValueError:
+            valid = False
+        if not valid:
+            raise HTTPException(status_code=400, detail=f"Invalid watermark: {watermark}")
 
     try:
-        content = await file.read()
-        zip_buffer = io.BytesIO(content)
-        
-        with zipfile.ZipFile(zip_buffer, "r") as zip_ref:
-            file_names = zip_ref.namelist()
-            
-            # Helper to decode and parse CSV
-            def parse_csv(filename):
-                if filename not in file_names:
-                    return []
-                with zip_ref.open(filename) as f:
-                    # Read and decode
-                    csv_content = io.TextIOWrapper(f, encoding="utf-8")
-                    reader = csv.DictReader(csv_content)
-                    return list(reader)
-
-            # 1. Import Categories
-            categories_data = parse_csv("categories.csv")
-            for row in categories_data:
-                cat_id = UUID(row["id"])
-                category = await db.get(Category, cat_id)
-                if category:
-                    category.name = row["name"]
-                    category.description = row["description"] or None
-                else:
-                    category = Category(
-                        id=cat_id,
-                        name=row["name"],
-                        description=row["description"] or None
-                    )
-                    db.add(category)
-            
-            await db.flush() # Ensure categories exist for FKs
-
-            # 2. Import Accounts
-            accounts_data = parse_csv("accounts.csv")
-            for row in accounts_data:
-                acc_id = UUID(row["id"])
-                
-                # Determine intended user_id from CSV
-                # If "None", it's a destination account. Otherwise, assign to current user.
-                row_user_id = row.get("user_id")
-                target_user_id = current_user.id
-                if row_user_id == "None" or not row_user_id:
-                    target_user_id = None
-
-                account = await db.get(Account, acc_id)
-                
-                # Verify ownership if exists (only for non-admin)
-                # If account exists and belongs to another user, skip (unless Admin)
-                # If account is a destination account (user_id=None), regular user shouldn't update it?
-                # For now, let's strictly enforce ownership check against current user's ID
-                if account and current_user.permission != UserRole.ADMIN:
-                     if account.user_id != current_user.id and account.user_id is not None:
-                         continue
-                
-                # Parse fields
-                balance_val = Decimal(row["initial_balance"])
-                # Handle balance_date being potentially missing in old backups (though we just fixed export)
-                b_date = date.fromisoformat(row.get("balance_date", date.today().isoformat()))
-                
-                if account:
-                    account.name = row["name"]
-                    account.account_number = row["account_number"] or None
-                    account.bank_name = row["bank_name"] or None
-                    account.currency = row["currency"]
-                    account.initial_balance = balance_val
-                    account.balance_date = b_date
-                    account.user_id = target_user_id
-                else:
-                    account = Account(
-                        id=acc_id,
-                        name=row["name"],
-                        account_number=row["account_number"] or None,
-                        bank_name=row["bank_name"] or None,
-                        currency=row["currency"],
-                        initial_balance=balance_val,
-                        balance_date=b_date,
-                        user_id=target_user_id
-                    )
-                    db.add(account)
-            
-            await db.flush()
-
-            # 3. Import Transactions
-            transactions_data = parse_csv("transactions.csv")
-            for row in transactions_data:
-                trans_id = UUID(row["id"])
-                account_id = UUID(row["account_id"])
-                
-                # Check if account exists (it should, we just imported)
-                # If we skipped an account due to permission, we should skip transaction
-                account = await db.get(Account, account_id)
-                if not account:
-                    continue
-                    
-                target_account_id = UUID(row["target_account_id"]) if row.get("target_account_id") else None
-                category_id = UUID(row["category_id"]) if row.get("category_id") else None
-                
-                amount_val = Decimal(row["amount"])
-                date_val = datetime.fromisoformat(row["date"]) # Use fromisoformat for datetime
-
-                transaction = await db.get(Transaction, trans_id)
-                
-                if transaction:
-                    transaction.date = date_val
-                    transaction.name = row["name"]
-                    transaction.type = row["type"]
-                    transaction.amount = amount_val
-                    transaction.account_id = account_id
-                    transaction.target_account_id = target_account_id
-                    transaction.category_id = category_id
-                else:
-                    transaction = Transaction(
-                        id=trans_id,
-                        date=date_val,
-                        name=row["name"],
-                        type=row["type"],
-                        amount=amount_val,
-                        account_id=account_id,
-                        target_account_id=target_account_id,
-                        category_id=category_id
-                    )
-                    db.add(transaction)
-
-            await db.commit()
-            
-            return {"message": "Restore successful", "counts": {
-                "categories": len(categories_data),
-                "accounts": len(accounts_data),
-                "transactions": len(transactions_data)
-            }}
+        counts = {"categories": 0, "accounts": 0, "transactions": 0, "deleted": 0}
+
+        for upload in uploads:
+            content = await upload.read()
+            zip_buffer = io.BytesIO(content)
+
+            with zipfile.ZipFile(zip_buffer, "r") as zip_ref:
+                applied = await _apply_backup(zip_ref, db, current_user)
+
+            manifest = applied["manifest"]
+            # A delta must start at or before the point the previous archive covers
+            if manifest["type"] == "delta" and not watermark:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{upload.filename} is an incremental backup: restore it after its full backup, or pass the watermark that restore returned",
+                )
+            if manifest["type"] == "delta" and datetime.fromisoformat(manifest["since"]) > datetime.fromisoformat(watermark):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Gap in backup chain: {upload.filename} starts at {manifest['since']} but previous backup ends at {watermark}",
+                )
+            watermark = manifest["watermark"] or watermark
 
+            for key, value in applied["counts"].items():
+                counts[key] += value
+
+        await category_cache.invalidate(db)
+        await account_totals.invalidate(db)
+        await db.commit()
+
+        return {"message": "Restore successful", "counts": counts, "watermark": watermark}
+
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Restore failed: {str(e)}")
@@ -9,7 +9,8 @@ from app.api import deps
 from app.core import security
 from app.core.config import settings
 from app.models import User
-from app.schemas.token import Token
+from app.schemas.token import RefreshTokenRequest, RevokeTokenRequest, Token
+from app.services.refresh_tokens import create_refresh_token, get_valid_refresh_token, revoke_refresh_tokens
 
 router = APIRouter()
 
@@ -25,17 +26,74 @@ async def login_access_token(
         result = await db.execute(select(User).where(User.username == form_data.username))
         user = result.scalars().first()
         
-        if not user or not security.verify_password(form_data.password, user.hashed_password):
+        if not user or not await security.verify_password_async(form_data.password, user.hashed_password):
             raise HTTPException(status_code=400, detail="Incorrect email or password")
         
+        refresh_token = create_refresh_token(db, user.id)
+        await db.commit()
+
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         return {
             "access_token": security.create_access_token(
                 user.id, expires_delta=access_token_expires
             ),
             "token_type": "bearer",
+            "refresh_token": refresh_token,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/login/refresh-token", response_model=Token)
+async def refresh_access_token(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    request: RefreshTokenRequest,
+) -> Any:
+    """
+    Exchange a refresh token for a new access token, without a password check
+    """
+    try:
+        refresh_token = await get_valid_refresh_token(db, request.refresh_token)
+        if not refresh_token:
+            raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+
+        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        return {
+            "access_token": security.create_access_token(
+                refresh_token.user_id, expires_delta=access_token_expires
+            ),
+            "token_type": "bearer",
+            "refresh_token": request.refresh_token,
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/login/revoke-token")
+async def revoke_token(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    request: RevokeTokenRequest,
+) -> Any:
+    """
+    Revoke a refresh token (logout), or with `revoke_all` every refresh
+    token of its user (logout everywhere)
+    """
+    try:
+        if request.revoke_all:
+            refresh_token = await get_valid_refresh_token(db, request.refresh_token)
+            if not refresh_token:
+                raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+            await revoke_refresh_tokens(db, user_id=refresh_token.user_id)
+            await db.commit()
+            return {"message": "All refresh tokens of the user revoked"}
+        await revoke_refresh_tokens(db, token=request.refresh_token)
+        await db.commit()
+        return {"message": "Refresh token revoked"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -4,13 +4,12 @@ from uuid import UUID
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func
-from sqlmodel import select
 from pydantic import BaseModel
 
 from app.api import deps
-from app.models import Transaction, Account, User, TransactionType, TransactionRead
-from app.models.user import UserRole
+from app.api.responses import json_response, row_dicts
+from app.db import statements
+from app.models import User, TransactionType, TransactionRead
 
 router = APIRouter()
 
@@ -34,7 +33,7 @@ class ReportResponse(BaseModel):
 @router.post("/category", response_model=ReportResponse)
 async def get_category_report(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     request: CategoryReportRequest,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
@@ -42,51 +41,26 @@ async def get_category_report(
     Get transactions filtered by categories with total sum.
     """
     try:
-        # Base query
-        if current_user.permission == UserRole.ADMIN:
-            query = select(Transaction)
-        else:
-            query = select(Transaction).join(Account).where(Account.user_id == current_user.id)
-        
-        # Apply filters
-        if request.account_id:
-            query = query.where(Transaction.account_id == request.account_id)
-        
-        if request.start_date:
-            query = query.where(Transaction.date >= request.start_date)
-        if request.end_date:
-            query = query.where(Transaction.date <= request.end_date)
-            
-        if request.category_ids:
-            query = query.where(Transaction.category_id.in_(request.category_ids))
-            
-        # Execute main query for transactions
-        query = query.order_by(Transaction.date.desc())
-        query = query.offset(request.skip).limit(request.limit)
-        
-        result = await db.execute(query)
-        transactions = result.scalars().all()
+        # Prebuilt statements for this set of filters (app/db/statements.py)
+        params = statements.transaction_filter_params(
+            current_user,
+            account_id=request.account_id,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            category_ids=request.category_ids,
+        )
+        filters = frozenset(params)
+
+        result = await db.execute(
+            statements.transaction_page(filters), {**params, "skip": request.skip, "limit": request.limit}
+        )
+        transactions = result.all()
         
-        # Calculate total
-        # For total, we need to run a query without limit/offset
-        if current_user.permission == UserRole.ADMIN:
-            count_query = select(func.sum(Transaction.amount))
-        else:
-            count_query = select(func.sum(Transaction.amount)).join(Account).where(Account.user_id == current_user.id)
-            
-        if request.account_id:
-            count_query = count_query.where(Transaction.account_id == request.account_id)
-        if request.start_date:
-            count_query = count_query.where(Transaction.date >= request.start_date)
-        if request.end_date:
-            count_query = count_query.where(Transaction.date <= request.end_date)
-        if request.category_ids:
-            count_query = count_query.where(Transaction.category_id.in_(request.category_ids))
-            
-        sum_result = await db.execute(count_query)
+        # The total covers every match, not just the page
+        sum_result = await db.execute(statements.transaction_total(filters), params)
         total = sum_result.scalar() or Decimal(0)
         
-        return ReportResponse(total=total, transactions=transactions)
+        return json_response({"total": total, "transactions": row_dicts(transactions)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -94,7 +68,7 @@ async def get_category_report(
 @router.post("/type", response_model=ReportResponse)
 async def get_type_report(
     *,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     request: TypeReportRequest,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
@@ -102,50 +76,26 @@ async def get_type_report(
     Get transactions filtered by types with total sum.
     """
     try:
-        # Base query
-        if current_user.permission == UserRole.ADMIN:
-            query = select(Transaction)
-        else:
-            query = select(Transaction).join(Account).where(Account.user_id == current_user.id)
-        
-        # Apply filters
-        if request.account_id:
-            query = query.where(Transaction.account_id == request.account_id)
-        
-        if request.start_date:
-            query = query.where(Transaction.date >= request.start_date)
-        if request.end_date:
-            query = query.where(Transaction.date <= request.end_date)
-            
-        if request.types:
-            query = query.where(Transaction.type.in_(request.types))
-            
-        # Execute main query for transactions
-        query = query.order_by(Transaction.date.desc())
-        query = query.offset(request.skip).limit(request.limit)
-        
-        result = await db.execute(query)
-        transactions = result.scalars().all()
+        # Prebuilt statements for this set of filters (app/db/statements.py)
+        params = statements.transaction_filter_params(
+            current_user,
+            account_id=request.account_id,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            types=request.types,
+        )
+        filters = frozenset(params)
+
+        result = await db.execute(
+            statements.transaction_page(filters), {**params, "skip": request.skip, "limit": request.limit}
+        )
+        transactions = result.all()
         
-        # Calculate total
-        if current_user.permission == UserRole.ADMIN:
-            count_query = select(func.sum(Transaction.amount))
-        else:
-            count_query = select(func.sum(Transaction.amount)).join(Account).where(Account.user_id == current_user.id)
-            
-        if request.account_id:
-            count_query = count_query.where(Transaction.account_id == request.account_id)
-        if request.start_date:
-            count_query = count_query.where(Transaction.date >= request.start_date)
-        if request.end_date:
-            count_query = count_query.where(Transaction.date <= request.end_date)
-        if request.types:
-            count_query = count_query.where(Transaction.type.in_(request.types))
-            
-        sum_result = await db.execute(count_query)
+        # The total covers every match, not just the page
+        sum_result = await db.execute(statements.transaction_total(filters), params)
         total = sum_result.scalar() or Decimal(0)
         
-        return ReportResponse(total=total, transactions=transactions)
+        return json_response({"total": total, "transactions": row_dicts(transactions)})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
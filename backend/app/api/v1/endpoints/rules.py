@@ -0,0 +1,162 @@
+from typing import Any, List, Optional
+from uuid import UUID
+import re
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import or_, select
+
+from app.api import deps
+from app.api.responses import serialize_list
+from app.models import Account, Category, Rule, RuleCreate, RuleRead, RuleUpdate, RuleMatchType, User
+from app.models.user import UserRole
+from app.services.rules import compile_rule_pattern
+
+router = APIRouter()
+
+def validate_rule(rule: Rule) -> None:
+    if not rule.pattern and rule.min_amount is None and rule.max_amount is None:
+        raise HTTPException(status_code=400, detail="A rule needs a pattern or an amount range.")
+    if not rule.category_id and not rule.target_account_id:
+        raise HTTPException(status_code=400, detail="A rule must assign a category or a destination account.")
+    if rule.pattern and rule.match_type == RuleMatchType.REGEX:
+        try:
+            compile_rule_pattern(rule.pattern)
+        except re.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid regular expression: {str(e)}")
+
+async def validate_rule_references(
+    db: AsyncSession,
+    current_user: User,
+    category_id: Optional[UUID],
+    target_account_id: Optional[UUID],
+) -> None:
+    """
+    The category must exist, and the destination account must be the
+    user's own or a shared destination account: rules apply it on import.
+    """
+    if category_id:
+        result = await db.execute(select(Category.id).where(Category.id == category_id))
+        if result.scalar() is None:
+            raise HTTPException(status_code=404, detail="Category not found")
+    if target_account_id:
+        result = await db.execute(
+            select(Account.id).where(
+                Account.id == target_account_id,
+                or_(Account.user_id == current_user.id, Account.user_id == None),
+            )
+        )
+        if result.scalar() is None:
+            raise HTTPException(status_code=404, detail="Destination account not found")
+
+@router.get("/", response_model=List[RuleRead])
+async def read_rules(
+    db: AsyncSession = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve the current user's categorization rules.
+    """
+    try:
+        query = (
+            select(Rule)
+            .where(Rule.user_id == current_user.id)
+            .order_by(Rule.priority.desc(), Rule.name)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return serialize_list(RuleRead, result.scalars().all())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/", response_model=RuleRead)
+async def create_rule(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    rule_in: RuleCreate,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create new categorization rule.
+    """
+    try:
+        if current_user.permission == UserRole.READONLY:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+
+        rule = Rule.model_validate(rule_in, update={"user_id": current_user.id})
+        validate_rule(rule)
+        await validate_rule_references(db, current_user, rule.category_id, rule.target_account_id)
+        db.add(rule)
+        await db.commit()
+        await db.refresh(rule)
+        return rule
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.put("/{rule_id}", response_model=RuleRead)
+async def update_rule(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    rule_id: UUID,
+    rule_in: RuleUpdate,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Update a categorization rule.
+    """
+    try:
+        if current_user.permission == UserRole.READONLY:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+
+        result = await db.execute(select(Rule).where(Rule.id == rule_id, Rule.user_id == current_user.id))
+        rule = result.scalars().first()
+        if not rule:
+            raise HTTPException(status_code=404, detail="Rule not found")
+
+        update_data = rule_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(rule, field, value)
+        validate_rule(rule)
+        await validate_rule_references(
+            db, current_user, update_data.get("category_id"), update_data.get("target_account_id")
+        )
+
+        db.add(rule)
+        await db.commit()
+        await db.refresh(rule)
+        return rule
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/{rule_id}", response_model=RuleRead)
+async def delete_rule(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    rule_id: UUID,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Delete a categorization rule.
+    """
+    try:
+        if current_user.permission == UserRole.READONLY:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+
+        result = await db.execute(select(Rule).where(Rule.id == rule_id, Rule.user_id == current_user.id))
+        rule = result.scalars().first()
+        if not rule:
+            raise HTTPException(status_code=404, detail="Rule not found")
+
+        await db.delete(rule)
+        await db.commit()
+        return rule
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
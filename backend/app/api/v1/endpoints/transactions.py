@@ -11,15 +11,18 @@ import io
 import json
 
 from app.api import deps
+from app.api.responses import rows_response
+from app.db import statements
 from app.models import Transaction, TransactionCreate, TransactionRead, TransactionUpdate, Account, User, TransactionType
 from app.models.user import UserRole
-from app.services.recurrence import process_recurrence
+from app.services.account_totals import account_totals
+from app.services.rules import get_rule_matcher
 
 router = APIRouter()
 
 @router.get("/", response_model=List[TransactionRead])
 async def read_transactions(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
     start_date: Optional[date] = Query(None),
@@ -31,26 +34,14 @@ async def read_transactions(
     Retrieve transactions.
     """
     try:
-        if current_user.permission == UserRole.ADMIN:
-            query = select(Transaction)
-        else:
-            # Join with Account to filter by user_id
-            query = select(Transaction).join(Account).where(Account.user_id == current_user.id)
-        
-        if account_id:
-            query = query.where(Transaction.account_id == account_id)
-
-        if start_date:
-            query = query.where(Transaction.date >= start_date)
-        if end_date:
-            query = query.where(Transaction.date <= end_date)
-            
-        query = query.order_by(Transaction.date.desc())
-        query = query.offset(skip).limit(limit)
-            
-        result = await db.execute(query)
-        transactions = result.scalars().all()
-        return transactions
+        # Prebuilt statement for this set of filters (app/db/statements.py)
+        params = statements.transaction_filter_params(
+            current_user, account_id=account_id, start_date=start_date, end_date=end_date
+        )
+        result = await db.execute(
+            statements.transaction_page(frozenset(params)), {**params, "skip": skip, "limit": limit}
+        )
+        return rows_response(result.all())
     except HTTPException:
         raise
     except Exception as e:
@@ -78,12 +69,21 @@ async def create_transaction(
         if account.user_id != current_user.id and current_user.permission != UserRole.ADMIN:
             raise HTTPException(status_code=400, detail="Not enough permissions")
 
+        # Apply the user's categorization rules to fill in missing fields
+        if not transaction_in.category_id or not transaction_in.target_account_id:
+            payee = None
+            if transaction_in.target_account_id:
+                result = await db.execute(select(Account.name).where(Account.id == transaction_in.target_account_id))
+                payee = result.scalar()
+            matcher = await get_rule_matcher(db, current_user.id)
+            matcher.apply([transaction_in], [payee])
+
         # Auto-assign category from target account if not provided
         if not transaction_in.category_id and transaction_in.target_account_id:
-            result = await db.execute(select(Account).where(Account.id == transaction_in.target_account_id))
-            target_account = result.scalars().first()
-            if target_account and target_account.category_id:
-                transaction_in.category_id = target_account.category_id
+            result = await db.execute(select(Account.category_id).where(Account.id == transaction_in.target_account_id))
+            target_category_id = result.scalar()
+            if target_category_id:
+                transaction_in.category_id = target_category_id
 
         transaction = Transaction.model_validate(transaction_in)
         
@@ -101,8 +101,12 @@ async def create_transaction(
         
         # Process recurrence
         if transaction.recurrency:
+            # Loaded on first use, with dateutil: few transactions recur
+            from app.services.recurrence import process_recurrence
+
             await process_recurrence(transaction, db)
 
+        await account_totals.invalidate(db, transaction.account_id)
         await db.commit()
         await db.refresh(transaction)
         return transaction
@@ -137,31 +141,33 @@ async def import_transactions(
                 target_account_names.add(row["target_account"])
         
         target_account_map = {}
-        for name in target_account_names:
-            # Check if exists (case-insensitive)
-            query = select(Account).where(
-                func.lower(Account.name) == func.lower(name),
+        if target_account_names:
+            # Look up all existing destination accounts at once (case-insensitive)
+            query = select(func.lower(Account.name), Account.id).where(
+                func.lower(Account.name).in_({name.lower() for name in target_account_names}),
                 Account.user_id == None
             )
             result = await db.execute(query)
-            account = result.scalars().first()
-            
-            if not account:
-                # Create new destination account
-                account = Account(
-                    name=name,
-                    initial_balance=Decimal(0),
-                    balance_date=date.today(),
-                    currency="USD",
-                    user_id=None
-                )
-                db.add(account)
-                await db.commit()
-                await db.refresh(account)
-            
-            target_account_map[name] = account.id
+            existing = dict(result.all())
+
+            for name in target_account_names:
+                account_id_for_name = existing.get(name.lower())
+                if not account_id_for_name:
+                    # Create new destination account
+                    account = Account(
+                        name=name,
+                        initial_balance=Decimal(0),
+                        balance_date=date.today(),
+                        currency="USD",
+                        user_id=None
+                    )
+                    db.add(account)
+                    account_id_for_name = existing[name.lower()] = account.id
+                target_account_map[name] = account_id_for_name
+            await db.flush()
 
         transactions_to_create = []
+        payees = []
         errors = []
         
         row_index = 0
@@ -169,6 +175,7 @@ async def import_transactions(
             row_index += 1
             try:
                 # Handle target_account mapping
+                payee = row.get("target_account") or None
                 if row.get("target_account"):
                     target_name = row["target_account"]
                     if target_name in target_account_map:
@@ -206,6 +213,7 @@ async def import_transactions(
                 # Let's use TransactionCreate to validate
                 transaction_in = TransactionCreate(**row)
                 transactions_to_create.append(transaction_in)
+                payees.append(payee)
                 
             except Exception as e:
                 errors.append(f"Row {row_index}: {str(e)}")
@@ -222,6 +230,10 @@ async def import_transactions(
         if len(owned_account_ids) != len(account_ids) and current_user.permission != UserRole.ADMIN:
             return {"status": "error", "message": "One or more accounts do not belong to the user"}
 
+        # Apply the user's categorization rules to the whole batch in one pass
+        matcher = await get_rule_matcher(db, current_user.id)
+        matcher.apply(transactions_to_create, payees)
+
         # Auto-assign category from destination account (target_account) when missing
         target_account_ids = {t.target_account_id for t in transactions_to_create if t.target_account_id}
         if target_account_ids:
@@ -256,6 +268,7 @@ async def import_transactions(
                         transaction.amount = -transaction.amount
 
                 db.add(transaction)
+            await account_totals.invalidate(db, *account_ids)
             await db.commit()
         except Exception as e:
             await db.rollback()
@@ -307,6 +320,8 @@ async def update_transaction(
             setattr(transaction, key, value)
 
         db.add(transaction)
+        # The old account and, if it moved, the new one
+        await account_totals.invalidate(db, current_account.id, transaction.account_id)
         await db.commit()
         await db.refresh(transaction)
         return transaction
@@ -341,6 +356,7 @@ async def delete_transaction(
             raise HTTPException(status_code=403, detail="Not enough permissions")
 
         await db.delete(transaction)
+        await account_totals.invalidate(db, transaction.account_id)
         await db.commit()
         return transaction
     except HTTPException:
@@ -384,6 +400,7 @@ async def bulk_delete_transactions(
         for transaction in transactions:
             await db.delete(transaction)
             
+        await account_totals.invalidate(db, *account_ids)
         await db.commit()
         return {"message": f"Deleted {len(transactions)} transactions"}
     except HTTPException:
@@ -6,7 +6,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from app.api import deps
+from app.api.responses import serialize_list
 from app.core import security
+from app.core.principal_cache import principal_cache
+from app.services.refresh_tokens import revoke_refresh_tokens
 from app.models import User, UserCreate, UserRead, UserUpdate
 from app.models.user import UserRole
 
@@ -24,8 +27,7 @@ async def read_users(
     """
     try:
         result = await db.execute(select(User).offset(skip).limit(limit))
-        users = result.scalars().all()
-        return users
+        return serialize_list(UserRead, result.scalars().all())
     except HTTPException:
         raise
     except Exception as e:
@@ -50,7 +52,10 @@ async def create_user(
                 detail="The user with this username already exists in the system.",
             )
         
-        user = User.model_validate(user_in, update={"hashed_password": security.get_password_hash(user_in.password)})
+        user = User.model_validate(user_in, update={
+            "hashed_password": await security.get_password_hash_async(user_in.password),
+            "is_default_password": security.is_default_password(user_in.password),
+        })
         db.add(user)
         await db.commit()
         await db.refresh(user)
@@ -61,18 +66,13 @@ async def create_user(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/me", response_model=UserRead)
-def read_user_me(
+async def read_user_me(
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get current user.
     """
-    try:
-        user_data = current_user.model_dump()
-        is_default = security.verify_password("admin", current_user.hashed_password)
-        return UserRead(**user_data, is_default_password=is_default)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return current_user
 
 @router.put("/{user_id}", response_model=UserRead)
 async def update_user(
@@ -97,14 +97,18 @@ async def update_user(
         update_data = user_in.model_dump(exclude_unset=True)
         if "password" in update_data:
             password = update_data["password"]
-            hashed_password = security.get_password_hash(password)
+            hashed_password = await security.get_password_hash_async(password)
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
+            update_data["is_default_password"] = security.is_default_password(password)
+            # A new password signs out every other session
+            await revoke_refresh_tokens(db, user_id=user.id)
             
         for field, value in update_data.items():
             setattr(user, field, value)
 
         db.add(user)
+        await principal_cache.invalidate(db, user.id)
         await db.commit()
         await db.refresh(user)
         return user
@@ -133,6 +137,7 @@ async def delete_user(
             )
         
         await db.delete(user)
+        await principal_cache.invalidate(db, user_id)
         await db.commit()
         return user
     except HTTPException:
@@ -160,19 +165,22 @@ async def update_user_me(
 
         if "password" in update_data:
             password = update_data["password"]
-            hashed_password = security.get_password_hash(password)
+            hashed_password = await security.get_password_hash_async(password)
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
+            update_data["is_default_password"] = security.is_default_password(password)
+            # A new password signs out every other session
+            await revoke_refresh_tokens(db, user_id=user.id)
             
         for field, value in update_data.items():
             setattr(user, field, value)
 
         db.add(user)
+        await principal_cache.invalidate(db, user.id)
         await db.commit()
         await db.refresh(user)
-
-        user_data = user.model_dump()
-        is_default = security.verify_password("admin", user.hashed_password)
-        return UserRead(**user_data, is_default_password=is_default)
+        return user
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
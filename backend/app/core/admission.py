@@ -0,0 +1,134 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.metrics import (
+    admission_in_flight,
+    admission_queue_depth,
+    admission_rejected_total,
+    admission_wait_seconds,
+)
+
+HEAVY = "heavy"
+REPORTS = "reports"
+INTERACTIVE = "interactive"
+
+# Whole-file uploads and downloads; everything not listed is interactive
+HEAVY_ROUTES = {
+    ("GET", f"{settings.API_V1_STR}/export/backup"),
+    ("POST", f"{settings.API_V1_STR}/import/restore"),
+    ("POST", f"{settings.API_V1_STR}/transactions/import"),
+    ("POST", f"{settings.API_V1_STR}/accounts/destination/import"),
+    ("POST", f"{settings.API_V1_STR}/categories/import"),
+}
+REPORTS_PREFIX = f"{settings.API_V1_STR}/reports/"
+
+def route_class(method: str, path: str) -> str:
+    if (method, path) in HEAVY_ROUTES:
+        return HEAVY
+    if path.startswith(REPORTS_PREFIX):
+        return REPORTS
+    return INTERACTIVE
+
+class AdmissionLimiter:
+    """
+    Admission control for one class of routes in this worker. At most
+    `limit` requests run at once and up to `queue_limit` more wait, each for
+    at most `queue_timeout` seconds; past that requests get a 503. One user
+    may hold at most `per_user_limit` running or waiting requests; past that
+    they get a 429. Both carry `Retry-After`.
+    """
+
+    def __init__(self, name: str, limit: int, queue_limit: int, per_user_limit: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_limit = queue_limit
+        self.per_user_limit = per_user_limit
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+        self._per_user: Dict[str, int] = {}
+        self._publish()
+
+    def _publish(self) -> None:
+        admission_in_flight.set(self.running, self.name)
+        admission_queue_depth.set(self.waiting, self.name)
+
+    def _reject(self, status_code: int, reason: str, detail: str) -> HTTPException:
+        admission_rejected_total.inc(self.name, reason)
+        return HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+
+    @asynccontextmanager
+    async def admit(self, user_key: str) -> AsyncIterator[None]:
+        held = self._per_user.get(user_key, 0)
+        if held >= self.per_user_limit:
+            raise self._reject(429, "user_limit", "Too many concurrent requests, please retry")
+        if self._semaphore.locked() and self.waiting >= self.queue_limit:
+            raise self._reject(503, "queue_full", "Server busy, please retry")
+
+        self._per_user[user_key] = held + 1
+        try:
+            start = time.perf_counter()
+            self.waiting += 1
+            self._publish()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject(503, "queue_timeout", "Server busy, please retry")
+            finally:
+                self.waiting -= 1
+                self._publish()
+            admission_wait_seconds.observe(time.perf_counter() - start, self.name)
+
+            self.running += 1
+            self._publish()
+            try:
+                yield
+            finally:
+                self.running -= 1
+                self._publish()
+                self._semaphore.release()
+        finally:
+            remaining = self._per_user[user_key] - 1
+            if remaining:
+                self._per_user[user_key] = remaining
+            else:
+                del self._per_user[user_key]
+
+    def status(self) -> dict:
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "queue_limit": self.queue_limit,
+            "waiting": self.waiting,
+            "per_user_limit": self.per_user_limit,
+            "users": len(self._per_user),
+            "rejected": {
+                reason: int(admission_rejected_total.get(self.name, reason))
+                for reason in ("user_limit", "queue_full", "queue_timeout")
+            },
+        }
+
+limiters: Dict[str, AdmissionLimiter] = {
+    HEAVY: AdmissionLimiter(
+        HEAVY, settings.ADMISSION_HEAVY_LIMIT, settings.ADMISSION_HEAVY_QUEUE,
+        settings.ADMISSION_HEAVY_PER_USER, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ),
+    REPORTS: AdmissionLimiter(
+        REPORTS, settings.ADMISSION_REPORTS_LIMIT, settings.ADMISSION_REPORTS_QUEUE,
+        settings.ADMISSION_REPORTS_PER_USER, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ),
+    INTERACTIVE: AdmissionLimiter(
+        INTERACTIVE, settings.ADMISSION_INTERACTIVE_LIMIT, settings.ADMISSION_INTERACTIVE_QUEUE,
+        settings.ADMISSION_INTERACTIVE_PER_USER, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ),
+}
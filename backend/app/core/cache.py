@@ -0,0 +1,417 @@
+"""
+Caches that stay correct with several worker processes.
+
+A `Cache` maps ids in its namespace to JSON-compatible values, kept by a
+backend: `MemoryBackend`, a bounded LRU per worker, or `PostgresBackend`,
+one copy shared by every worker in the UNLOGGED `cache_entry` table
+(`CACHE_BACKEND`).
+
+Writes call `await cache.invalidate(db, *ids)` in the transaction that
+changes the data. That publishes the keys with `pg_notify`, which Postgres
+delivers only if the transaction commits, to every worker's
+`InvalidationBus` listener; each drops the keys from its caches. The
+category and principal caches, which keep their own copies, subscribe to the
+same channel.
+
+A worker whose listener is down could miss invalidations, so until it
+reconnects its caches are bypassed, and they are cleared when it does.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Text, bindparam, delete, event, or_, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import cache_invalidations_total, cache_listener_connected, cache_lookups_total
+from app.models import CacheEntry
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads are limited to 8000 bytes (not characters)
+MAX_PAYLOAD_BYTES = 7000
+
+NOTIFY = text("SELECT pg_notify(:channel, payload) FROM unnest(:payloads) AS payload").bindparams(
+    bindparam("payloads", type_=ARRAY(Text))
+)
+
+def _namespace(key: str) -> str:
+    return key.split(":", 1)[0]
+
+def _payloads(lines: List[str]) -> List[str]:
+    """
+    `lines` joined with newlines into as few payloads as fit the limit, in
+    bytes. A single line over the limit is an error: callers must keep
+    their lines short.
+    """
+    payloads, batch, size = [], [], 0
+    for line in lines:
+        length = len(line.encode())
+        if length > MAX_PAYLOAD_BYTES:
+            raise ValueError(f"NOTIFY line of {length} bytes, over {MAX_PAYLOAD_BYTES}")
+        if batch and size + length + 1 > MAX_PAYLOAD_BYTES:
+            payloads.append("\n".join(batch))
+            batch, size = [], 0
+        batch.append(line)
+        size += length + 1
+    if batch:
+        payloads.append("\n".join(batch))
+    return payloads
+
+class InvalidationBus:
+    """
+    Invalidation keys over Postgres LISTEN/NOTIFY on the primary. A key is
+    `namespace:id`, or a bare `namespace` for everything in it; subscribers
+    receive the keys of their namespace.
+
+    Other channels can share the listener connection (`listen`); their
+    handlers get the lines of each payload.
+    """
+
+    def __init__(self, channel: str, retry_seconds: float = 1.0, keepalive_seconds: float = 30.0):
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.connected = False
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {}
+        self._channels: Dict[str, Callable[[List[str]], None]] = {channel: self._on_invalidation}
+        self._reset_hooks: List[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, namespace: str, callback: Callable[[str], None]) -> None:
+        self._subscribers.setdefault(namespace, []).append(callback)
+
+    def listen(self, channel: str, handler: Callable[[List[str]], None], on_reset: Optional[Callable[[], None]] = None) -> None:
+        """
+        Also listen on `channel`. `on_reset` runs on every (re)connection:
+        anything sent while disconnected was missed.
+        """
+        self._channels[channel] = handler
+        if on_reset is not None:
+            self._reset_hooks.append(on_reset)
+
+    def notify_statements(self, channel: str, lines: List[str]) -> List[Tuple[Any, dict]]:
+        """
+        The statements that send `lines` on `channel`, split into payloads
+        that fit: one statement, however many payloads.
+        """
+        if not lines:
+            return []
+        return [(NOTIFY, {"channel": channel, "payloads": _payloads(lines)})]
+
+    async def publish(self, db: AsyncSession, keys: Iterable[str]) -> None:
+        """
+        Notify every worker of `keys` once `db`'s transaction commits.
+        """
+        keys = list(dict.fromkeys(keys))
+        for statement, params in self.notify_statements(self.channel, keys):
+            await db.execute(statement, params)
+        # This worker drops them right after the commit, before its own notification arrives
+        event.listen(db.sync_session, "after_commit", lambda session: self.dispatch(keys), once=True)
+
+    def dispatch(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            for callback in self._subscribers.get(_namespace(key), ()):
+                callback(key)
+
+    def reset(self) -> None:
+        """
+        Drop everything every subscriber holds.
+        """
+        self.dispatch(list(self._subscribers))
+        for hook in self._reset_hooks:
+            hook()
+
+    def _on_invalidation(self, keys: List[str]) -> None:
+        for key in keys:
+            cache_invalidations_total.inc(_namespace(key))
+        self.dispatch(keys)
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        self._channels[channel](payload.split("\n"))
+
+    def _set_connected(self, connected: bool) -> None:
+        self.connected = connected
+        cache_listener_connected.set(1 if connected else 0)
+
+    async def start(self, timeout: float = 5.0) -> None:
+        """
+        Start listening in the background; wait up to `timeout` seconds for
+        the first connection.
+        """
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._listen())
+        deadline = time.monotonic() + timeout
+        while not self.connected and time.monotonic() < deadline and not self._task.done():
+            await asyncio.sleep(0.01)
+        if not self.connected:
+            logger.warning("Not listening for cache invalidations yet; caches are bypassed until then")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        connect_args = make_url(settings.SQLALCHEMY_DATABASE_URI).translate_connect_args(
+            username="user", database="database"
+        )
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(**connect_args)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda conn: closed.set())
+                for channel in self._channels:
+                    await connection.add_listener(channel, self._on_notification)
+                # Anything cached before now may have missed an invalidation
+                self.reset()
+                self._set_connected(True)
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), self.keepalive_seconds)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1", timeout=self.keepalive_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed, retrying: {e}")
+            finally:
+                self._set_connected(False)
+                if connection is not None:
+                    connection.terminate()
+            await asyncio.sleep(self.retry_seconds)
+
+class MemoryBackend:
+    """
+    Bounded LRU with expiry, private to this worker.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    async def get_many(self, db: AsyncSession, namespace: str, keys: List[str]) -> Tuple[Dict[str, Any], Any]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[1]
+        # Evictions on notification keep it current: no versions needed
+        return found, None
+
+    async def set_many(self, db: AsyncSession, namespace: str, values: Dict[str, Any], versions: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def invalidate(self, db: AsyncSession, keys: List[str]) -> None:
+        # Nothing shared to change: every worker evicts on the notification
+        pass
+
+    def evict(self, key: str) -> None:
+        with self._lock:
+            if ":" in key:
+                self._entries.pop(key, None)
+            else:
+                for cached in [cached for cached in self._entries if _namespace(cached) == key]:
+                    del self._entries[cached]
+
+# Expiry of namespace version rows, which must never be swept
+NAMESPACE_EXPIRES_AT = datetime(9999, 1, 1)
+
+class PostgresBackend:
+    """
+    One copy for every worker, in the UNLOGGED `cache_entry` table of the
+    primary, read and filled through the request's own primary session.
+
+    Entries are versioned, so a fill loaded before a write commits can never
+    overwrite that write's invalidation, whichever worker it runs on: an
+    invalidation (in the writer's transaction) empties the entry and bumps
+    its version, and a fill only lands if the version is still the one it
+    saw before loading. A whole-namespace invalidation bumps the namespace's
+    own row as well, which fills check under a share lock.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._purged_at = 0.0
+
+    async def get_many(self, db: AsyncSession, namespace: str, keys: List[str]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        The live entries among `keys`, and the version of every key and of
+        the namespace (missing: 0) for `set_many`.
+        """
+        result = await db.execute(
+            select(CacheEntry.key, CacheEntry.value, CacheEntry.expires_at, CacheEntry.version)
+            .where(CacheEntry.key.in_(keys + [namespace]))
+        )
+        now = datetime.utcnow()
+        found, versions = {}, dict.fromkeys(keys + [namespace], 0)
+        for key, value, expires_at, version in result.all():
+            versions[key] = version
+            if key != namespace and value is not None and expires_at > now:
+                found[key] = value
+        return found, versions
+
+    async def set_many(self, db: AsyncSession, namespace: str, values: Dict[str, Any], versions: Dict[str, int]) -> None:
+        """
+        Store `values` for the keys whose version is still the one
+        `get_many` saw, and commit `db`.
+        """
+        try:
+            await self._fill(db, namespace, values, versions)
+        except DBAPIError:
+            # Best effort: a fill that deadlocks with a writer is simply not cached
+            logger.warning("Cache fill for %s failed", namespace, exc_info=True)
+            await db.rollback()
+
+    async def _fill(self, db: AsyncSession, namespace: str, values: Dict[str, Any], versions: Dict[str, int]) -> None:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        # Fills are checked against the namespace's row: make sure there is one to lock
+        await db.execute(
+            pg_insert(CacheEntry)
+            .values(key=namespace, value=None, expires_at=NAMESPACE_EXPIRES_AT, version=0)
+            .on_conflict_do_nothing(index_elements=["key"])
+        )
+        # Held until the commit: a namespace invalidation waits for this fill
+        result = await db.execute(
+            select(CacheEntry.version).where(CacheEntry.key == namespace).with_for_update(read=True)
+        )
+        # Otherwise the whole namespace was invalidated since: the values may be stale
+        if result.scalar() == versions[namespace]:
+            statement = pg_insert(CacheEntry).values([
+                {"key": key, "value": value, "expires_at": expires_at, "version": versions[key]}
+                # In key order, like invalidations, so they cannot deadlock each other
+                for key, value in sorted(values.items())
+            ])
+            await db.execute(statement.on_conflict_do_update(
+                index_elements=["key"],
+                set_={"value": statement.excluded.value, "expires_at": statement.excluded.expires_at},
+                where=CacheEntry.version == statement.excluded.version,
+            ))
+        # Expired entries are never read again; sweep them now and then
+        if time.monotonic() - self._purged_at > self.ttl_seconds:
+            await db.execute(delete(CacheEntry).where(CacheEntry.expires_at <= now))
+            self._purged_at = time.monotonic()
+        await db.commit()
+
+    async def invalidate(self, db: AsyncSession, keys: List[str]) -> None:
+        """
+        Empty the entries and bump their versions in the writer's
+        transaction, so they change when the write commits.
+        """
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        rows = [
+            {"key": key, "value": None, "version": 1, "expires_at": expires_at if ":" in key else NAMESPACE_EXPIRES_AT}
+            for key in sorted(set(keys))
+        ]
+        statement = pg_insert(CacheEntry).values(rows)
+        # Waits for fills holding the namespace's row, so the update below sees their rows
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=["key"],
+            set_={"value": None, "version": CacheEntry.version + 1, "expires_at": statement.excluded.expires_at},
+        ))
+        namespaces = [key for key in keys if ":" not in key]
+        if namespaces:
+            await db.execute(
+                update(CacheEntry)
+                .where(or_(*(CacheEntry.key.startswith(f"{ns}:") for ns in namespaces)))
+                .values(value=None, version=CacheEntry.version + 1)
+            )
+
+    def evict(self, key: str) -> None:
+        pass
+
+def cache_backend():
+    if settings.CACHE_BACKEND == "postgres":
+        return PostgresBackend(settings.CACHE_TTL_SECONDS)
+    return MemoryBackend(settings.CACHE_TTL_SECONDS, settings.CACHE_MAX_SIZE)
+
+class Cache:
+    def __init__(self, namespace: str, backend, bus: InvalidationBus):
+        self.namespace = namespace
+        self.backend = backend
+        self.bus = bus
+        # Bumped by every invalidation: a load that saw it move may be stale
+        self._generation = 0
+        bus.subscribe(namespace, self._invalidated)
+
+    def _key(self, id: Any) -> str:
+        return f"{self.namespace}:{id}"
+
+    def _invalidated(self, key: str) -> None:
+        self._generation += 1
+        self.backend.evict(key)
+
+    async def get_many(
+        self, db: AsyncSession, ids: Iterable[Any], load: Callable[[List[Any]], Awaitable[Dict[Any, Any]]]
+    ) -> Dict[Any, Any]:
+        """
+        Values for `ids`. Missing ones come from `load(missing_ids)`, which
+        must return a JSON-compatible value for each id it is given.
+
+        `db` is a primary session with no pending writes: the shared backend
+        reads through it and commits its fills on it.
+        """
+        ids = list(ids)
+        if not self.bus.connected:
+            cache_lookups_total.inc(self.namespace, "bypass", amount=len(ids))
+            return await load(ids)
+
+        generation = self._generation
+        keys = {self._key(id): id for id in ids}
+        found, versions = await self.backend.get_many(db, self.namespace, list(keys))
+        values = {keys[key]: value for key, value in found.items()}
+        missing = [id for id in ids if id not in values]
+        cache_lookups_total.inc(self.namespace, "hit", amount=len(values))
+        if missing:
+            cache_lookups_total.inc(self.namespace, "miss", amount=len(missing))
+            loaded = await load(missing)
+            values.update(loaded)
+            if self._generation == generation and self.bus.connected:
+                await self.backend.set_many(
+                    db, self.namespace, {self._key(id): value for id, value in loaded.items()}, versions
+                )
+        return values
+
+    async def invalidate(self, db: AsyncSession, *ids: Any) -> None:
+        """
+        Drop `ids` (no ids: the whole namespace) from every worker's cache
+        once `db`'s transaction commits.
+        """
+        keys = [self._key(id) for id in ids] if ids else [self.namespace]
+        await self.backend.invalidate(db, keys)
+        await self.bus.publish(db, keys)
+
+invalidation_bus = InvalidationBus(settings.CACHE_NOTIFY_CHANNEL)
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Report POSTs only read; other POSTs carry uploads or changes
+READ_ONLY_PREFIXES = (f"{settings.API_V1_STR}/reports/",)
+
+def is_cancellable(scope: Scope) -> bool:
+    if scope["method"] in ("GET", "HEAD"):
+        return True
+    return scope["method"] == "POST" and scope["path"].startswith(READ_ONLY_PREFIXES)
+
+class DisconnectCancelMiddleware:
+    """
+    Cancel a read request's handler as soon as its client disconnects, so a
+    running query is cancelled in Postgres and its session and connection
+    go back to the pool instead of finishing work nobody will receive.
+
+    Writes are left alone: an upload or change the client stopped waiting
+    for still completes (or rolls back) on its own.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not is_cancellable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue()
+        response_complete = False
+        disconnected = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        handler = asyncio.ensure_future(self.app(scope, messages.get, send_wrapper))
+
+        async def watch() -> None:
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    if not response_complete:
+                        disconnected = True
+                        handler.cancel()
+                    return
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+            # Nothing can be sent any more; the outer middleware records a 499
+            scope.setdefault("state", {})["client_disconnected"] = True
+            logger.info("Client disconnected, cancelled %s %s", scope["method"], scope["path"])
+        finally:
+            watcher.cancel()
@@ -0,0 +1,30 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# ZIP backups are already compressed and event streams must not be buffered
+COMPRESSIBLE_TYPES = ("application/json", "text/csv", "text/plain")
+
+class SelectiveGZipResponder(GZipResponder):
+    async def send_with_compression(self, message: Message) -> None:
+        await super().send_with_compression(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.content_type_is_excluded = not content_type.startswith(COMPRESSIBLE_TYPES)
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZip for JSON, CSV and plain-text responses of at least `minimum_size`
+    bytes, when the client accepts it. Other content types pass through.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = SelectiveGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
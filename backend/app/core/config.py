@@ -1,12 +1,25 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Literal
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Nivetek Finance Manager"
     API_V1_STR: str = "/api/v1"
+    # Collect Prometheus metrics. They are served at /metrics, on the app's
+    # port, only when METRICS_TOKEN is set, to scrapers sending it as a
+    # bearer token (Prometheus' `authorization` scrape option)
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""
+    # Allowed CORS origins
+    BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
+    # GZip JSON, CSV and text responses from this many bytes; 0 disables it
+    GZIP_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESS_LEVEL: int = 5
     SECRET_KEY: str = "changethis" # TODO: Change in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # How often (seconds) a worker picks up refresh tokens revoked elsewhere
+    REFRESH_TOKEN_REVOCATION_SYNC_SECONDS: float = 10.0
     
     POSTGRES_SERVER: str = "localhost"
     POSTGRES_USER: str = "postgres"
@@ -14,6 +27,86 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "finance_manager"
     POSTGRES_PORT: int = 5432
     DATABASE_URI: str | None = None
+    # Optional read-only replica for reports and other GET endpoints
+    READ_REPLICA_URI: str | None = None
+
+    # Serving (`python -m app.serve`): worker processes, each with its own pools
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    WORKERS: int = 1
+    # Open pool connections and load caches before a worker takes traffic
+    WARMUP_ENABLED: bool = True
+    # Connections left free for migrations, psql and other clients
+    DB_RESERVED_CONNECTIONS: int = 5
+
+    # Engine and connection pool
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    # Prepared statements cached per connection; set to 0 behind pgbouncer
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Server-side statement_timeout in milliseconds, 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # statement_timeout (ms) by route template prefix, longest match wins,
+    # e.g. {"/api/v1/reports/": 30000, "/api/v1/export/": 120000}
+    DB_ROUTE_STATEMENT_TIMEOUTS_MS: Dict[str, int] = {}
+    # Cancel read requests, and their queries, when the client disconnects
+    CANCEL_ON_DISCONNECT: bool = True
+
+    # Caches (app/core/cache.py): "memory" keeps a copy per worker, "postgres"
+    # one shared copy in an UNLOGGED table. Either way writes publish
+    # invalidations on this LISTEN/NOTIFY channel of the primary database.
+    CACHE_BACKEND: Literal["memory", "postgres"] = "memory"
+    CACHE_TTL_SECONDS: float = 300.0
+    CACHE_MAX_SIZE: int = 10000
+    CACHE_NOTIFY_CHANNEL: str = "cache_invalidation"
+
+    # Server-Sent Events (GET /events/), per worker: open streams allowed,
+    # events buffered per stream, keep-alive interval, and how long a stream
+    # lasts before the client reconnects (and re-authenticates)
+    EVENTS_NOTIFY_CHANNEL: str = "account_events"
+    EVENTS_MAX_STREAMS: int = 1000
+    EVENTS_QUEUE_SIZE: int = 1000
+    EVENTS_KEEPALIVE_SECONDS: float = 15.0
+    EVENTS_STREAM_MAX_SECONDS: float = 300.0
+
+    # Incremental backups: each watermark is set back this far (seconds)
+    # from the export's snapshot, longer than any write transaction and any
+    # clock skew between the app and the database, so no delta misses a row
+    # committed after its snapshot but stamped before it
+    BACKUP_WATERMARK_MARGIN_SECONDS: float = 300.0
+
+    # How often (seconds) a worker re-checks the shared category version
+    CATEGORY_CACHE_TTL_SECONDS: float = 5.0
+
+    # Verified tokens are trusted for this long without re-reading the user
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # Admission control per route class and worker: requests running at once,
+    # more allowed to wait for a slot, and the share one user may hold
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_HEAVY_LIMIT: int = 2
+    ADMISSION_HEAVY_QUEUE: int = 4
+    ADMISSION_HEAVY_PER_USER: int = 1
+    ADMISSION_REPORTS_LIMIT: int = 8
+    ADMISSION_REPORTS_QUEUE: int = 16
+    ADMISSION_REPORTS_PER_USER: int = 4
+    ADMISSION_INTERACTIVE_LIMIT: int = 64
+    ADMISSION_INTERACTIVE_QUEUE: int = 256
+    ADMISSION_INTERACTIVE_PER_USER: int = 32
+    # How long a queued request waits before a 503, and the Retry-After sent
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+
+    # bcrypt runs on its own bounded thread pool, off the event loop. Its
+    # threads still compete with the loop for CPU, so by default (0) there
+    # is one per core left once every worker's event loop has one, at least 1
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
 
     class Config:
         case_sensitive = True
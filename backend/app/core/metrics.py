@@ -0,0 +1,272 @@
+import os
+import sys
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def get(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, total in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {total}")
+        return lines
+
+class Gauge:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = Lock()
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def get(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(label_values)
+            if data is None:
+                data = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            data[index] += 1
+            data[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, data in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), data[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels + ('le',), values + (le,))} {cumulative}"
+                )
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {data[-1]}")
+        return lines
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries", "SQL statements issued per HTTP request.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route")
+)
+admission_in_flight = Gauge(
+    "admission_in_flight", "Requests running, by admission class.", ("route_class",)
+)
+admission_queue_depth = Gauge(
+    "admission_queue_depth", "Requests waiting for a slot, by admission class.", ("route_class",)
+)
+admission_rejected_total = Counter(
+    "admission_rejected_total", "Requests turned away by admission control.", ("route_class", "reason")
+)
+admission_wait_seconds = Histogram(
+    "admission_wait_seconds", "Time admitted requests waited for a slot.", ("route_class",)
+)
+cache_lookups_total = Counter(
+    "cache_lookups_total", "Cache lookups by outcome (hit, miss, bypass while not listening).", ("cache", "result")
+)
+cache_invalidations_total = Counter(
+    "cache_invalidations_total", "Invalidation keys received over LISTEN/NOTIFY.", ("cache",)
+)
+cache_listener_connected = Gauge(
+    "cache_listener_connected", "Whether this worker is listening for cache invalidations."
+)
+events_streams_open = Gauge("events_streams_open", "Open Server-Sent Events streams.")
+events_sent_total = Counter(
+    "events_sent_total", "Server-Sent Events by outcome (queued, sent, dropped when a stream fell behind).", ("result",)
+)
+db_queries_total = Counter("db_queries_total", "SQL statements executed.")
+db_compiled_cache_total = Counter(
+    "db_compiled_cache_total", "SQL statements by compiled-cache outcome (hit, miss, uncached).", ("result",)
+)
+db_query_duration_seconds = Histogram("db_query_duration_seconds", "SQL statement latency.")
+
+REGISTRY = [
+    http_requests_total,
+    http_request_duration_seconds,
+    http_request_db_queries,
+    http_request_db_seconds,
+    admission_in_flight,
+    admission_queue_depth,
+    admission_rejected_total,
+    admission_wait_seconds,
+    cache_lookups_total,
+    cache_invalidations_total,
+    cache_listener_connected,
+    events_streams_open,
+    events_sent_total,
+    db_queries_total,
+    db_compiled_cache_total,
+    db_query_duration_seconds,
+]
+
+# SQLAlchemy's per-execution compiled-cache outcome; raw SQL is not cached
+CACHE_RESULTS = {CacheStats.CACHE_HIT: "hit", CacheStats.CACHE_MISS: "miss"}
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.setdefault("query_start", [])
+    # Where this statement's start sits, for `_handle_error`
+    context.query_start_depth = len(starts)
+    starts.append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_queries_total.inc()
+    db_compiled_cache_total.inc(CACHE_RESULTS.get(context.cache_hit, "uncached"))
+    db_query_duration_seconds.observe(elapsed)
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute: drop its start
+    # (if it got that far), or the stack grows on the pooled connection
+    depth = getattr(exception_context.execution_context, "query_start_depth", None)
+    if depth is not None and exception_context.connection is not None:
+        del exception_context.connection.info.get("query_start", [])[depth:]
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count SQL statements, their compiled-cache hits and the time spent in
+    them, globally and per request.
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and SQL usage per route
+    template (e.g. `/api/v1/accounts/{account_id}`), not per raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request_stats.reset(token)
+            if scope.get("state", {}).get("client_disconnected"):
+                # Client closed the request, as nginx reports it
+                status_code = 499
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests_total.inc(method, route_path, str(status_code))
+            http_request_duration_seconds.observe(elapsed, method, route_path)
+            http_request_db_queries.observe(stats.queries, method, route_path)
+            http_request_db_seconds.observe(stats.db_seconds, method, route_path)
+
+def get_process_memory() -> Dict[str, int]:
+    """
+    Resident set size of this worker now and at its peak, in bytes.
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        peak = peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        peak = 0
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        rss = peak
+    return {"pid": os.getpid(), "rss_bytes": rss, "peak_rss_bytes": peak}
+
+def render_metrics(extra: Iterable[str] = ()) -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
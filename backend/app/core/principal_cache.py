@@ -0,0 +1,99 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import invalidation_bus
+from app.core.config import settings
+from app.models import User
+
+CACHE_NAME = "principal"
+
+class PrincipalCache:
+    """
+    Bounded, short-TTL cache of verified access tokens and the user they
+    resolve to, so authenticated requests skip the JWT decode and user SELECT.
+
+    Entries hold a snapshot of the user row; every hit gets its own detached
+    `User` instance, which a session can still `add()` to issue an UPDATE.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._tokens_by_user: Dict[UUID, Set[str]] = {}
+        self._lock = Lock()
+
+    def get(self, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at <= time.time():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+
+        user = User(**data)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, token: str, user: User, token_expires_at: Optional[float] = None) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (expires_at, user.model_dump())
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    async def invalidate(self, db: AsyncSession, user_id: UUID) -> None:
+        """
+        Drop the user's tokens in every worker once `db`'s transaction
+        commits.
+        """
+        await invalidation_bus.publish(db, [f"{CACHE_NAME}:{user_id}"])
+
+    def _invalidated(self, key: str) -> None:
+        user_id = key.partition(":")[2]
+        if user_id:
+            self.invalidate_user(UUID(user_id))
+        else:
+            self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[1]["id"]
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+principal_cache = PrincipalCache(
+    settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_SIZE
+)
+invalidation_bus.subscribe(CACHE_NAME, principal_cache._invalidated)
@@ -1,10 +1,61 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from functools import lru_cache
+from typing import Any, Callable, Union
+from fastapi import HTTPException
 from jose import jwt
-from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    # passlib is only needed once a password is hashed or checked
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Password the seeded admin account starts with
+DEFAULT_PASSWORD = "admin"
+
+class BoundedExecutor:
+    """
+    Thread pool for CPU-heavy work with a cap on queued jobs. Once the cap is
+    reached new work is rejected with a 503 instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, queue_limit: int, thread_name_prefix: str):
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.thread_name_prefix = thread_name_prefix
+        self.pending = 0
+        self._executor = None
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        if self.pending >= self.max_workers + self.queue_limit:
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+def password_hash_workers() -> int:
+    if settings.PASSWORD_HASH_WORKERS:
+        return settings.PASSWORD_HASH_WORKERS
+    return max(1, (os.cpu_count() or 1) // settings.WORKERS - 1)
+
+password_executor = BoundedExecutor(
+    password_hash_workers(), settings.PASSWORD_HASH_QUEUE_LIMIT, "password-hash"
+)
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     if expires_delta:
@@ -17,7 +68,16 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
     return encoded_jwt
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_executor.run(get_password_hash, password)
+
+def is_default_password(password: str) -> bool:
+    return password == DEFAULT_PASSWORD
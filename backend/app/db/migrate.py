@@ -0,0 +1,99 @@
+"""
+One-shot schema migration, run once per deploy before the workers start:
+
+    uv run python -m app.db.migrate
+
+Upgrades the database to the latest Alembic revision and seeds the admin
+user. Workers only check that the schema is at that revision on startup.
+"""
+import asyncio
+import logging
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlmodel import select
+
+from app.db.session import engine, async_session
+from app.models import User
+from app.models.user import UserRole
+from app.core.security import DEFAULT_PASSWORD, get_password_hash_async
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    # Keep the caller's logging setup; alembic.ini would replace it
+    config.attributes["configure_logger"] = False
+    return config
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+async def current_revision() -> str | None:
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except ProgrammingError:
+            # No alembic_version table: never migrated
+            return None
+        return result.scalar()
+
+async def check_schema_version() -> None:
+    """
+    Refuse to serve against a schema other than the one this code expects.
+    """
+    current, expected = await current_revision(), head_revision()
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {expected}. "
+            "Run `python -m app.db.migrate` first."
+        )
+
+def _upgrade(connection) -> None:
+    from alembic import command
+
+    config = alembic_config()
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
+
+async def seed_admin() -> None:
+    async with async_session() as session:
+        result = await session.execute(select(User).where(User.username == "admin"))
+        user = result.scalars().first()
+
+        if not user:
+            user = User(
+                username="admin",
+                email="admin@example.com",
+                hashed_password=await get_password_hash_async(DEFAULT_PASSWORD),
+                is_default_password=True,
+                permission=UserRole.ADMIN,
+                label="System Admin"
+            )
+            session.add(user)
+            await session.commit()
+
+async def migrate() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade)
+    await seed_admin()
+
+def main() -> None:
+    logging.basicConfig(format="%(levelname)-5.5s [%(name)s] %(message)s")
+    logging.getLogger("alembic").setLevel(logging.INFO)
+
+    async def run() -> None:
+        try:
+            await migrate()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
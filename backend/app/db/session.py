@@ -1,13 +1,132 @@
+import time
+from contextlib import asynccontextmanager
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, echo=True, future=True)
+class PoolStats:
+    """
+    Running totals of how long requests waited to check out a connection.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float) -> None:
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record(time.perf_counter() - start)
+
+def engine_options() -> dict:
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    return {
+        "echo": settings.DB_ECHO,
+        "future": True,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": {
+            # SQLAlchemy's own prepared statement cache and asyncpg's
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    }
+
+engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, **engine_options())
+
+# Reads fall back to the primary when no replica is configured
+read_engine = (
+    create_async_engine(settings.READ_REPLICA_URI, **engine_options())
+    if settings.READ_REPLICA_URI else engine
+)
+
+instrument_engine(engine.sync_engine)
+instrument_engine(read_engine.sync_engine)
+
+# Built once per process and shared by every request
+async_session = sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
+read_async_session = sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+def set_statement_timeout(session: AsyncSession, timeout_ms: int) -> None:
+    """
+    Apply `statement_timeout` to every transaction `session` begins, for
+    that transaction only.
+    """
+    @event.listens_for(session.sync_session, "after_begin")
+    def _set_timeout(sync_session, transaction, connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
 
 async def get_session() -> AsyncSession:
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
     async with async_session() as session:
         yield session
+
+async def get_read_session() -> AsyncSession:
+    async with read_async_session() as session:
+        yield session
+
+@asynccontextmanager
+async def primary_session(db: AsyncSession):
+    """
+    `db` if it is bound to the primary, otherwise a new primary session: for
+    reads that outlive the request, such as cache fills, which must not come
+    from a lagging replica.
+    """
+    if db.bind is engine:
+        yield db
+    else:
+        async with async_session() as session:
+            yield session
+
+def get_pool_status(pool_engine=engine) -> dict:
+    pool = pool_engine.pool
+    stats = pool.stats
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout": settings.DB_POOL_TIMEOUT,
+        "checkouts": stats.checkouts,
+        "checkout_timeouts": stats.timeouts,
+        "checkout_wait_total_seconds": round(stats.wait_total, 6),
+        "checkout_wait_max_seconds": round(stats.wait_max, 6),
+        "checkout_wait_avg_seconds": round(stats.wait_total / stats.checkouts, 6) if stats.checkouts else 0.0,
+    }
+
+def get_compiled_cache_size(pool_engine=engine) -> int:
+    # Statements in SQLAlchemy's compiled cache, shared by the engine's connections
+    cache = pool_engine.sync_engine._compiled_cache
+    return len(cache) if cache is not None else 0
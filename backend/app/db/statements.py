@@ -0,0 +1,92 @@
+"""
+Prebuilt, parameterized statements for the hot read queries.
+
+Building a `select()` per request costs more Python time than running it:
+each `.where()` copies the statement and SQLAlchemy then walks the result to
+compute its compiled-cache key. The statements here are built once, with
+`bindparam()` in place of the request's values, so their cache key is
+computed once and memoized and their SQL text never changes, which also lets
+asyncpg reuse its prepared statement on every connection. Pass the values at
+execution: `await db.execute(statement, params)`.
+
+Transaction queries take optional filters; there is one statement per set of
+filters in use (at most a few dozen), built on first use.
+"""
+from functools import lru_cache
+from typing import FrozenSet
+
+from sqlalchemy import Integer, bindparam, func
+from sqlalchemy.sql import Select
+from sqlmodel import select
+
+from app.api.responses import read_columns
+from app.models import Account, AccountRead, Transaction, TransactionRead, User
+from app.models.user import UserRole
+
+# deps.get_current_user on a principal cache miss
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+ACCOUNT_PAGE = (
+    select(*read_columns(AccountRead, Account))
+    .where(Account.user_id != None)
+    .offset(bindparam("skip", type_=Integer))
+    .limit(bindparam("limit", type_=Integer))
+)
+USER_ACCOUNT_PAGE = (
+    select(*read_columns(AccountRead, Account))
+    .where(Account.user_id == bindparam("user_id"))
+    .offset(bindparam("skip", type_=Integer))
+    .limit(bindparam("limit", type_=Integer))
+)
+ACCOUNT_TOTALS = (
+    select(Transaction.account_id, func.sum(Transaction.amount))
+    .where(Transaction.account_id.in_(bindparam("account_ids", expanding=True)))
+    .group_by(Transaction.account_id)
+)
+
+# Optional transaction filters by parameter name, in the order they apply.
+# `user_id` scopes to the user's accounts and needs the join to Account.
+TRANSACTION_FILTERS = {
+    "user_id": Account.user_id == bindparam("user_id"),
+    "account_id": Transaction.account_id == bindparam("account_id"),
+    "start_date": Transaction.date >= bindparam("start_date"),
+    "end_date": Transaction.date <= bindparam("end_date"),
+    "category_ids": Transaction.category_id.in_(bindparam("category_ids", expanding=True)),
+    "types": Transaction.type.in_(bindparam("types", expanding=True)),
+}
+
+def transaction_filter_params(user: User, **filters) -> dict:
+    """
+    Bound values for the transaction filters that apply: every filter given
+    a value, plus the account owner for non-admins. Its keys select the
+    statement: `transaction_page(frozenset(params))`.
+    """
+    params = {name: value for name, value in filters.items() if value}
+    if user.permission != UserRole.ADMIN:
+        params["user_id"] = user.id
+    return params
+
+def _filtered(query: Select, filters: FrozenSet[str]) -> Select:
+    if "user_id" in filters:
+        query = query.join(Account, Transaction.account_id == Account.id)
+    for name, criterion in TRANSACTION_FILTERS.items():
+        if name in filters:
+            query = query.where(criterion)
+    return query
+
+@lru_cache(maxsize=None)
+def transaction_page(filters: FrozenSet[str]) -> Select:
+    """
+    Newest-first page of transactions as plain rows; also takes `skip` and
+    `limit`.
+    """
+    return (
+        _filtered(select(*read_columns(TransactionRead, Transaction)), filters)
+        .order_by(Transaction.date.desc())
+        .offset(bindparam("skip", type_=Integer))
+        .limit(bindparam("limit", type_=Integer))
+    )
+
+@lru_cache(maxsize=None)
+def transaction_total(filters: FrozenSet[str]) -> Select:
+    return _filtered(select(func.sum(Transaction.amount)), filters)
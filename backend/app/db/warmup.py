@@ -0,0 +1,60 @@
+"""
+Per-worker warm-up, run by the lifespan before the worker takes traffic, so
+the first requests do not pay for connecting, cache loads and statement
+compilation.
+"""
+import asyncio
+from contextlib import AsyncExitStack
+from typing import List
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.responses import type_adapter
+from app.core.config import settings
+from app.core.security import get_pwd_context
+from app.db import statements
+from app.db.session import engine, read_engine, async_session
+from app.models import AccountRead, CategoryRead, RuleRead, UserRead
+from app.services.category_cache import category_cache
+from app.services.refresh_tokens import revocation_list
+
+# No user has this id: the lookup compiles and prepares without a match
+NO_USER = UUID(int=0)
+
+async def prime_connection(conn: AsyncConnection) -> None:
+    """
+    Run the statements every authenticated request needs once on `conn`,
+    warming SQLAlchemy's compiled cache and this connection's prepared
+    statements.
+    """
+    async with AsyncSession(bind=conn) as session:
+        # deps.get_current_user on a principal cache miss
+        await session.execute(statements.USER_BY_ID, {"user_id": NO_USER})
+
+async def fill_pool(pool_engine: AsyncEngine) -> int:
+    """
+    Open `DB_POOL_SIZE` connections at once and prime each; they stay in the
+    pool once returned.
+    """
+    async with AsyncExitStack() as stack:
+        connections = await asyncio.gather(
+            *(stack.enter_async_context(pool_engine.connect()) for _ in range(settings.DB_POOL_SIZE))
+        )
+        await asyncio.gather(*(prime_connection(conn) for conn in connections))
+    return len(connections)
+
+async def warm_up() -> None:
+    for pool_engine in {engine, read_engine}:
+        await fill_pool(pool_engine)
+
+    async with async_session() as session:
+        await category_cache.all(session)
+        await revocation_list.preload(session)
+
+    # Loads passlib, which is otherwise imported by the first login
+    get_pwd_context()
+    # TypeAdapters the list endpoints build on first use
+    for model in (AccountRead, CategoryRead, RuleRead, UserRead):
+        type_adapter(List[model])
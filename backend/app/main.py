@@ -1,25 +1,32 @@
 from fastapi import FastAPI, Request, status
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from sqlalchemy.exc import DBAPIError
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.db.init_db import init_db
+from app.core.cache import invalidation_bus
+from app.db.migrate import check_schema_version
+from app.db.session import engine, read_engine, get_compiled_cache_size, get_pool_status
+from app.db.warmup import warm_up
+from app.core.cancellation import DisconnectCancelMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, get_process_memory, render_metrics
 import logging
+import secrets
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
+    await check_schema_version()
+    await invalidation_bus.start()
+    if settings.WARMUP_ENABLED:
+        await warm_up()
     yield
+    await invalidation_bus.stop()
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    lifespan=lifespan
-)
-
-@app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     exc_str = f'{exc}'.replace('\n', ' ').replace('   ', ' ')
     logging.error(f"{request}: {exc_str}")
@@ -27,26 +34,110 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     print(f"VALIDATION ERROR: {exc_str}")
     return JSONResponse(content=content, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
-# Set all CORS enabled origins
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://localhost:8000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.include_router(api_router, prefix=settings.API_V1_STR)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://localhost:8000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.include_router(api_router, prefix=settings.API_V1_STR)
-
-@app.get("/")
+def is_statement_timeout(exc: BaseException) -> bool:
+    # 57014 is also a cancel on request; only the timeout says so
+    return (
+        isinstance(exc, DBAPIError)
+        and getattr(exc.orig, "sqlstate", None) == "57014"
+        and "statement timeout" in str(exc.orig)
+    )
+
+def statement_timeout_response() -> JSONResponse:
+    return JSONResponse(
+        {"detail": "The database query took too long and was cancelled (statement timeout)."},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+async def database_exception_handler(request: Request, exc: DBAPIError):
+    if is_statement_timeout(exc):
+        return statement_timeout_response()
+    # Anything else is a 500 from the server error middleware, as before
+    raise exc
+
+async def wrapped_exception_handler(request: Request, exc: StarletteHTTPException):
+    # Endpoints turn any error into a 500 carrying its text; a statement
+    # timeout (DB_ROUTE_STATEMENT_TIMEOUTS_MS) is the server shedding load
+    if exc.status_code == 500 and is_statement_timeout(exc.__context__):
+        return statement_timeout_response()
+    return await http_exception_handler(request, exc)
+
 def root():
     return {"message": "Welcome to Nivetek Finance Manager API"}
+
+def metrics(request: Request):
+    if not secrets.compare_digest(request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"):
+        return PlainTextResponse("Not authenticated", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    statuses = {"primary": get_pool_status(engine)}
+    if read_engine is not engine:
+        statuses["replica"] = get_pool_status(read_engine)
+    extra = []
+    for name, description in (
+        ("checked_out", "Connections currently checked out."),
+        ("overflow", "Connections open beyond pool_size."),
+        ("checkout_timeouts", "Checkouts that timed out waiting for a connection."),
+        ("checkout_wait_total_seconds", "Total time spent waiting to check out a connection."),
+    ):
+        metric = f"db_pool_{name}"
+        extra += [f"# HELP {metric} {description}", f"# TYPE {metric} gauge"]
+        for pool_name, status in statuses.items():
+            extra.append(f'{metric}{{pool="{pool_name}"}} {status[name]}')
+    extra += [
+        "# HELP db_compiled_cache_entries Statements in SQLAlchemy's compiled cache.",
+        "# TYPE db_compiled_cache_entries gauge",
+    ]
+    for pool_name, pool_engine in (("primary", engine), ("replica", read_engine)):
+        if pool_name in statuses:
+            extra.append(f'db_compiled_cache_entries{{pool="{pool_name}"}} {get_compiled_cache_size(pool_engine)}')
+    memory = get_process_memory()
+    extra += [
+        "# HELP process_resident_memory_bytes Resident memory size in bytes.",
+        "# TYPE process_resident_memory_bytes gauge",
+        f"process_resident_memory_bytes {memory['rss_bytes']}",
+    ]
+    return PlainTextResponse(render_metrics(extra), media_type="text/plain; version=0.0.4")
+
+def create_app() -> FastAPI:
+    """
+    Build the application: every router and middleware is registered once,
+    here.
+
+    Middleware, outermost first: metrics (so it times the whole request,
+    compression included), CORS, compression, then cancellation on client
+    disconnect, closest to the handler it cancels.
+    """
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(DBAPIError, database_exception_handler)
+    app.add_exception_handler(StarletteHTTPException, wrapped_exception_handler)
+
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+    app.add_api_route("/", root, methods=["GET"])
+    if settings.METRICS_ENABLED and settings.METRICS_TOKEN:
+        app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+
+    # add_middleware wraps what is already there: innermost first
+    if settings.CANCEL_ON_DISCONNECT:
+        app.add_middleware(DisconnectCancelMiddleware)
+    if settings.GZIP_MINIMUM_SIZE:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.GZIP_MINIMUM_SIZE,
+            compresslevel=settings.GZIP_COMPRESS_LEVEL,
+        )
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.BACKEND_CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+app = create_app()
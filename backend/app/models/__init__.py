@@ -2,3 +2,8 @@ from .user import User, UserCreate, UserRead, UserUpdate, UserRole
 from .account import Account, AccountCreate, AccountRead, AccountUpdate
 from .transaction import Transaction, TransactionCreate, TransactionRead, TransactionUpdate, TransactionType
 from .category import Category, CategoryCreate, CategoryRead, CategoryUpdate
+from .tombstone import Tombstone
+from .cache_version import CacheVersion
+from .cache_entry import CacheEntry
+from .rule import Rule, RuleCreate, RuleRead, RuleUpdate, RuleField, RuleMatchType
+from .refresh_token import RefreshToken
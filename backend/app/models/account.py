@@ -1,6 +1,6 @@
 from typing import Optional
 from uuid import UUID, uuid4
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from sqlmodel import Field, SQLModel
 
@@ -16,6 +16,11 @@ class AccountBase(SQLModel):
 
 class Account(AccountBase, table=True):
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    updated_at: Optional[datetime] = Field(
+        default_factory=datetime.utcnow,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
 
 class AccountCreate(AccountBase):
     pass
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Column
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+class CacheEntry(SQLModel, table=True):
+    """
+    Entry of the shared cache backend (`CACHE_BACKEND=postgres`). UNLOGGED:
+    nothing here needs to survive a crash.
+    """
+    __tablename__ = "cache_entry"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key: str = Field(primary_key=True)
+    # Empty once invalidated, until the next fill
+    value: Any = Field(default=None, sa_column=Column(JSONB(none_as_null=True), nullable=True))
+    expires_at: datetime = Field(index=True)
+    # Bumped by every invalidation; a fill only replaces the version it saw
+    version: int = Field(default=0)
@@ -0,0 +1,11 @@
+from sqlmodel import Field, SQLModel
+
+class CacheVersion(SQLModel, table=True):
+    """
+    Version counter per cached dataset, bumped on every write so that
+    other worker processes know their in-memory copy is stale.
+    """
+    __tablename__ = "cache_version"
+
+    name: str = Field(primary_key=True)
+    version: int = Field(default=0)
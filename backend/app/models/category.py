@@ -1,5 +1,6 @@
 from typing import Optional
 from uuid import UUID, uuid4
+from datetime import datetime
 from sqlmodel import Field, SQLModel
 
 class CategoryBase(SQLModel):
@@ -8,6 +9,11 @@ class CategoryBase(SQLModel):
 
 class Category(CategoryBase, table=True):
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    updated_at: Optional[datetime] = Field(
+        default_factory=datetime.utcnow,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
 
 class CategoryCreate(CategoryBase):
     pass
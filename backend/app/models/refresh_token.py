@@ -0,0 +1,15 @@
+from typing import Optional
+from uuid import UUID, uuid4
+from datetime import datetime
+from sqlmodel import Field, SQLModel
+
+class RefreshToken(SQLModel, table=True):
+    __tablename__ = "refresh_token"
+
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    # Only a SHA-256 of the token is stored
+    token_hash: str = Field(unique=True, index=True)
+    user_id: UUID = Field(foreign_key="user.id", ondelete="CASCADE", index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    revoked_at: Optional[datetime] = Field(default=None, index=True)
@@ -0,0 +1,51 @@
+from typing import Optional
+from uuid import UUID, uuid4
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from sqlmodel import Field, SQLModel
+
+class RuleField(str, Enum):
+    NAME = "name"
+    PAYEE = "payee"
+
+class RuleMatchType(str, Enum):
+    SUBSTRING = "substring"
+    REGEX = "regex"
+
+class RuleBase(SQLModel):
+    name: str
+    field: RuleField = Field(default=RuleField.NAME)
+    match_type: RuleMatchType = Field(default=RuleMatchType.SUBSTRING)
+    pattern: Optional[str] = None
+    min_amount: Optional[Decimal] = None
+    max_amount: Optional[Decimal] = None
+    category_id: Optional[UUID] = Field(default=None, foreign_key="category.id")
+    target_account_id: Optional[UUID] = Field(default=None, foreign_key="account.id")
+    priority: int = Field(default=0)
+
+class Rule(RuleBase, table=True):
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    user_id: Optional[UUID] = Field(default=None, foreign_key="user.id", index=True)
+    updated_at: Optional[datetime] = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
+
+class RuleCreate(RuleBase):
+    pass
+
+class RuleUpdate(SQLModel):
+    name: Optional[str] = None
+    field: Optional[RuleField] = None
+    match_type: Optional[RuleMatchType] = None
+    pattern: Optional[str] = None
+    min_amount: Optional[Decimal] = None
+    max_amount: Optional[Decimal] = None
+    category_id: Optional[UUID] = None
+    target_account_id: Optional[UUID] = None
+    priority: Optional[int] = None
+
+class RuleRead(RuleBase):
+    id: UUID
+    user_id: Optional[UUID] = None
@@ -0,0 +1,52 @@
+from typing import Optional
+from uuid import UUID, uuid4
+from datetime import datetime
+from sqlmodel import Field, SQLModel, select
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from .account import Account
+from .category import Category
+from .transaction import Transaction
+
+class Tombstone(SQLModel, table=True):
+    """
+    Record of a deleted transaction, account or category, so incremental
+    backups can carry deletions as well as changes.
+    """
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    entity: str = Field(index=True)
+    entity_id: UUID
+    user_id: Optional[UUID] = Field(default=None, index=True)
+    deleted_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+@event.listens_for(Session, "after_flush")
+def _record_deletions(session, flush_context):
+    """
+    Write one tombstone per deleted transaction, account or category, batched
+    into a single INSERT per flush.
+    """
+    deleted = [obj for obj in session.deleted if isinstance(obj, (Transaction, Account, Category))]
+    if not deleted:
+        return
+
+    connection = session.connection()
+
+    # Transactions are owned through their account, which may be gone too
+    owners = {obj.id: obj.user_id for obj in deleted if isinstance(obj, Account)}
+    missing = {obj.account_id for obj in deleted if isinstance(obj, Transaction)} - owners.keys()
+    if missing:
+        result = connection.execute(select(Account.id, Account.user_id).where(Account.id.in_(missing)))
+        owners.update(dict(result.all()))
+
+    now = datetime.utcnow()
+    rows = []
+    for obj in deleted:
+        if isinstance(obj, Transaction):
+            entity, user_id = "transaction", owners.get(obj.account_id)
+        elif isinstance(obj, Account):
+            entity, user_id = "account", obj.user_id
+        else:
+            entity, user_id = "category", None
+        rows.append({"id": uuid4(), "entity": entity, "entity_id": obj.id, "user_id": user_id, "deleted_at": now})
+    connection.execute(insert(Tombstone.__table__), rows)
@@ -1,6 +1,6 @@
 from typing import Optional, Any, Dict
 from uuid import UUID, uuid4
-from datetime import date as dt_date
+from datetime import date as dt_date, datetime
 from decimal import Decimal
 from enum import Enum
 from sqlmodel import Field, SQLModel
@@ -25,6 +25,11 @@ class TransactionBase(SQLModel):
 
 class Transaction(TransactionBase, table=True):
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    updated_at: Optional[datetime] = Field(
+        default_factory=datetime.utcnow,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
 
 class TransactionCreate(TransactionBase):
     pass
@@ -17,6 +17,7 @@ class UserBase(SQLModel):
 class User(UserBase, table=True):
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
     hashed_password: str
+    is_default_password: bool = Field(default=False)
 
 class UserCreate(UserBase):
     password: str
@@ -4,6 +4,14 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class RevokeTokenRequest(RefreshTokenRequest):
+    # Also revoke every other refresh token of the token's user
+    revoke_all: bool = False
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
@@ -0,0 +1,88 @@
+"""
+Production server:
+
+    uv run python -m app.serve
+
+Runs `WORKERS` uvicorn worker processes on `SERVER_HOST:SERVER_PORT`. Each
+worker checks the schema version and warms up (`app.db.warmup`) before it
+accepts connections. Before any worker starts, the connections all their
+pools may open are checked against the database's `max_connections`.
+"""
+import asyncio
+from typing import List
+
+import uvicorn
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+
+def connections_per_worker(primary: bool) -> int:
+    """
+    The most connections one worker holds on a database: its pool, full,
+    plus the cache invalidation and events listener on the primary.
+
+    A request holds at most one connection per database at a time (its
+    authentication and shared-cache reads run on that connection or before
+    it is taken; `benchmarks.query_budgets` and `benchmarks.read_replica`
+    check this), so a full pool is also the most requests a worker runs
+    against that database at once; the rest wait up to `DB_POOL_TIMEOUT`.
+    Warm-up, the schema check and the cache loads borrow pool connections.
+    """
+    return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW + (1 if primary else 0)
+
+async def available_connections(database_uri: str) -> int:
+    """
+    Connections the server accepts from ordinary roles.
+    """
+    probe = create_async_engine(database_uri, poolclass=NullPool)
+    try:
+        async with probe.connect() as conn:
+            result = await conn.execute(text(
+                "SELECT current_setting('max_connections')::int, "
+                "current_setting('superuser_reserved_connections')::int, "
+                # Postgres 16+
+                "coalesce(current_setting('reserved_connections', true), '0')::int"
+            ))
+            max_connections, superuser_reserved, reserved = result.one()
+    finally:
+        await probe.dispose()
+    return max_connections - superuser_reserved - reserved
+
+async def check_connection_limit() -> List[str]:
+    databases = {"primary": settings.SQLALCHEMY_DATABASE_URI}
+    if settings.READ_REPLICA_URI:
+        databases["replica"] = settings.READ_REPLICA_URI
+
+    problems = []
+    for name, database_uri in databases.items():
+        primary = name == "primary"
+        needed = settings.WORKERS * connections_per_worker(primary) + settings.DB_RESERVED_CONNECTIONS
+        available = await available_connections(database_uri)
+        if needed > available:
+            problems.append(
+                f"{name}: {settings.WORKERS} workers x (DB_POOL_SIZE {settings.DB_POOL_SIZE} + "
+                f"DB_MAX_OVERFLOW {settings.DB_MAX_OVERFLOW}{' + 1 listener' if primary else ''}) + "
+                f"DB_RESERVED_CONNECTIONS {settings.DB_RESERVED_CONNECTIONS} = {needed} connections, "
+                f"but the database accepts {available}"
+            )
+    return problems
+
+def main() -> None:
+    if settings.WORKERS < 1:
+        raise SystemExit(f"WORKERS must be at least 1, got {settings.WORKERS}")
+    problems = asyncio.run(check_connection_limit())
+    if problems:
+        raise SystemExit("Connection budget exceeded:\n" + "\n".join(problems))
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.WORKERS,
+        proxy_headers=True,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Account events for the Server-Sent Events stream (`GET /events/`).
+
+Every commit that adds, changes or deletes transactions, or changes an
+account's initial balance, publishes what changed with `pg_notify` on
+`EVENTS_NOTIFY_CHANNEL`, in that same transaction, so nothing is sent for a
+rollback. The changes are collected from the session's ORM flushes, which
+covers every write path: single writes, CSV imports, bulk deletes, restores
+and recurrences.
+
+Each worker's listener (app/core/cache.py) hands the events to its own open
+streams: those of the account's owner, and admins'.
+
+Events, as `{"user_id", "event", "data"}`:
+- `balance`: `{"account_id", "delta"}`, the change in the account's current
+  balance, summed per commit
+- `transaction`: `{"action": "created" | "updated", "transaction"}`,
+  `{"action": "deleted", "transaction": {"id", "account_id"}}`, or, for
+  commits touching more than `MAX_TRANSACTION_EVENTS` transactions,
+  `{"action": "bulk", "account_id", "count"}` per account
+  A `created` or `updated` event too large for a notification carries only
+  the transaction's `id` and `account_id`
+- `resync`: sent to the streams themselves when they may have missed events
+  (on connecting, after the listener reconnects, or when a stream fell
+  behind); clients reload what they show
+"""
+import asyncio
+from collections import defaultdict
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+import orjson
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from app.core.cache import MAX_PAYLOAD_BYTES, invalidation_bus
+from app.core.config import settings
+from app.core.metrics import events_sent_total, events_streams_open
+from app.models import Account, Transaction, TransactionRead, User
+from app.models.user import UserRole
+
+# Above this many transactions in one commit, one `bulk` event per account
+MAX_TRANSACTION_EVENTS = 100
+
+PENDING = "account_events"
+
+class PendingEvents:
+    """
+    What the flushes of the current transaction changed.
+    """
+
+    def __init__(self):
+        self.deltas: Dict[UUID, Decimal] = defaultdict(Decimal)
+        # (account_id, data) of each transaction event, until there are more
+        # than MAX_TRANSACTION_EVENTS; from then on only counts per account
+        self.transactions: Optional[List[tuple]] = []
+        self.counts: Dict[UUID, int] = defaultdict(int)
+
+    def add(self, account_id: UUID, action: str, data: Callable[[], dict]) -> None:
+        """
+        Record a transaction event; `data` builds its payload, only while
+        single events are still kept.
+        """
+        self.counts[account_id] += 1
+        if self.transactions is not None:
+            if len(self.transactions) < MAX_TRANSACTION_EVENTS:
+                self.transactions.append((account_id, {"action": action, "transaction": data()}))
+            else:
+                self.transactions = None
+
+def _pending(session: Session) -> PendingEvents:
+    return session.info.setdefault(PENDING, PendingEvents())
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value))
+
+def _old_value(obj, name: str):
+    history = inspect(obj).attrs[name].history
+    return history.deleted[0] if history.deleted else getattr(obj, name)
+
+def _transaction_data(obj: Transaction) -> dict:
+    return TransactionRead.model_validate(obj).model_dump(mode="json")
+
+def _after_flush(session: Session, flush_context) -> None:
+    # The session's new, dirty and deleted sets still hold what was just flushed
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            pending = _pending(session)
+            pending.deltas[obj.account_id] += _decimal(obj.amount)
+            pending.add(obj.account_id, "created", lambda: _transaction_data(obj))
+
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj):
+            pending = _pending(session)
+            pending.deltas[_old_value(obj, "account_id")] -= _decimal(_old_value(obj, "amount"))
+            pending.deltas[obj.account_id] += _decimal(obj.amount)
+            pending.add(obj.account_id, "updated", lambda: _transaction_data(obj))
+        elif isinstance(obj, Account) and inspect(obj).attrs.initial_balance.history.has_changes():
+            _pending(session).deltas[obj.id] += _decimal(obj.initial_balance) - _decimal(_old_value(obj, "initial_balance"))
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            pending = _pending(session)
+            pending.deltas[obj.account_id] -= _decimal(obj.amount)
+            pending.add(obj.account_id, "deleted", lambda: {"id": str(obj.id), "account_id": str(obj.account_id)})
+
+def _owners(session: Session, account_ids: Set[UUID]) -> Dict[UUID, Optional[UUID]]:
+    owners = {}
+    for account_id in account_ids:
+        account = session.identity_map.get(identity_key(Account, account_id))
+        if account is not None:
+            owners[account_id] = account.user_id
+    missing = account_ids - owners.keys()
+    if missing:
+        result = session.execute(select(Account.id, Account.user_id).where(Account.id.in_(missing)))
+        owners.update(result.all())
+    return owners
+
+def _event_line(user_id: UUID, name: str, data: dict) -> str:
+    """
+    The event as one notification line, short enough to never fail the
+    commit: transaction names and recurrences have no size limit, so an
+    oversized transaction event is cut to its ids (clients fetch the rest),
+    and anything still too long becomes a `resync`.
+    """
+    line = orjson.dumps({"user_id": str(user_id), "event": name, "data": data})
+    if len(line) > MAX_PAYLOAD_BYTES and "transaction" in data:
+        transaction = data["transaction"]
+        data = {
+            "action": data["action"],
+            "transaction": {"id": transaction["id"], "account_id": transaction["account_id"]},
+        }
+        line = orjson.dumps({"user_id": str(user_id), "event": name, "data": data})
+    if len(line) > MAX_PAYLOAD_BYTES:
+        line = orjson.dumps({"user_id": str(user_id), "event": "resync", "data": {}})
+    return line.decode()
+
+def _before_commit(session: Session) -> None:
+    # Commit flushes after this hook: flush first so its changes are included
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    pending: Optional[PendingEvents] = session.info.pop(PENDING, None)
+    if pending is None:
+        return
+
+    events = []
+    transactions = pending.transactions
+    if transactions is None:
+        transactions = [
+            (account_id, {"action": "bulk", "account_id": str(account_id), "count": count})
+            for account_id, count in pending.counts.items()
+        ]
+    owners = _owners(session, set(pending.deltas) | {account_id for account_id, _ in transactions})
+    for account_id, delta in pending.deltas.items():
+        if delta:
+            events.append((owners.get(account_id), "balance", {"account_id": str(account_id), "delta": str(delta)}))
+    for account_id, data in transactions:
+        events.append((owners.get(account_id), "transaction", data))
+
+    lines = [
+        _event_line(user_id, name, data)
+        for user_id, name, data in events
+        # Destination accounts belong to no one
+        if user_id is not None
+    ]
+    for statement, params in invalidation_bus.notify_statements(settings.EVENTS_NOTIFY_CHANNEL, lines):
+        session.execute(statement, params)
+
+def _after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING, None)
+
+event.listen(Session, "after_flush", _after_flush)
+event.listen(Session, "before_commit", _before_commit)
+event.listen(Session, "after_soft_rollback", _after_rollback)
+
+class EventStream:
+    def __init__(self, user: User, queue_size: int):
+        self.user_id = str(user.id)
+        self.admin = user.permission == UserRole.ADMIN
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, message: dict) -> None:
+        try:
+            self.queue.put_nowait(message)
+            events_sent_total.inc("queued")
+        except asyncio.QueueFull:
+            # Too far behind: drop what it has not read and tell it to reload
+            events_sent_total.inc("dropped")
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"event": "resync", "data": {}})
+
+class EventStreams:
+    """
+    This worker's open streams, by user.
+    """
+
+    def __init__(self, max_streams: int, queue_size: int):
+        self.max_streams = max_streams
+        self.queue_size = queue_size
+        self._by_user: Dict[str, Set[EventStream]] = {}
+        self._admins: Set[EventStream] = set()
+        self._count = 0
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.max_streams
+
+    def open(self, user: User) -> EventStream:
+        stream = EventStream(user, self.queue_size)
+        self._by_user.setdefault(stream.user_id, set()).add(stream)
+        if stream.admin:
+            self._admins.add(stream)
+        self._count += 1
+        events_streams_open.set(self._count)
+        return stream
+
+    def close(self, stream: EventStream) -> None:
+        streams = self._by_user.get(stream.user_id, set())
+        streams.discard(stream)
+        if not streams:
+            self._by_user.pop(stream.user_id, None)
+        self._admins.discard(stream)
+        self._count -= 1
+        events_streams_open.set(self._count)
+
+    def dispatch(self, lines: List[str]) -> None:
+        for line in lines:
+            message = orjson.loads(line)
+            for stream in self._by_user.get(message.pop("user_id"), set()) | self._admins:
+                stream.put(message)
+
+    def resync(self) -> None:
+        for streams in self._by_user.values():
+            for stream in streams:
+                stream.put({"event": "resync", "data": {}})
+
+event_streams = EventStreams(settings.EVENTS_MAX_STREAMS, settings.EVENTS_QUEUE_SIZE)
+invalidation_bus.listen(settings.EVENTS_NOTIFY_CHANNEL, event_streams.dispatch, on_reset=event_streams.resync)
@@ -0,0 +1,28 @@
+from decimal import Decimal
+from typing import Dict, List
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import Cache, cache_backend, invalidation_bus
+from app.db import statements
+from app.db.session import primary_session
+
+# Sum of each account's transactions, as a string (values are JSON). Every
+# write that adds, changes or removes a transaction invalidates its account.
+account_totals = Cache("account-total", cache_backend(), invalidation_bus)
+
+async def get_account_totals(db: AsyncSession, account_ids: List[UUID]) -> Dict[UUID, Decimal]:
+    """
+    For read-only requests: the shared cache commits its fills on `db` when
+    it is a primary session.
+    """
+    # Cached past this request, so never from a lagging replica; the cache
+    # and the totals share the request's primary connection
+    async with primary_session(db) as primary:
+        async def load(missing: List[UUID]) -> Dict[UUID, str]:
+            result = await primary.execute(statements.ACCOUNT_TOTALS, {"account_ids": missing})
+            totals = dict(result.all())
+            return {account_id: str(totals.get(account_id) or Decimal(0)) for account_id in missing}
+
+        totals = await account_totals.get_many(primary, account_ids, load)
+    return {account_id: Decimal(total) for account_id, total in totals.items()}
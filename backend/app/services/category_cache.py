@@ -0,0 +1,93 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+from uuid import UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache import invalidation_bus
+from app.core.config import settings
+from app.models import Category, CategoryRead, CacheVersion
+
+CACHE_NAME = "category"
+
+class CategoryCache:
+    """
+    In-process copy of the category table (id -> category, name -> id).
+
+    Writers bump a version row in `cache_version` in the same transaction as
+    their change and publish the `category` invalidation key, on which every
+    worker drops its copy (app/core/cache.py). Readers also re-check the
+    version at most every `CATEGORY_CACHE_TTL_SECONDS`, reloading when it
+    moved, which covers processes that are not listening.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._by_id: Dict[UUID, CategoryRead] = {}
+        self._by_name: Dict[str, UUID] = {}
+        self._by_lower_name: Dict[str, UUID] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _ensure_fresh(self, db: AsyncSession) -> None:
+        if self._version is not None and time.monotonic() - self._checked_at < self.ttl_seconds:
+            return
+
+        async with self._lock:
+            if self._version is not None and time.monotonic() - self._checked_at < self.ttl_seconds:
+                return
+
+            result = await db.execute(select(CacheVersion.version).where(CacheVersion.name == CACHE_NAME))
+            version = result.scalar() or 0
+
+            if version != self._version:
+                result = await db.execute(select(Category))
+                categories = [CategoryRead.model_validate(c) for c in result.scalars().all()]
+                self._by_id = {c.id: c for c in categories}
+                self._by_name = {c.name: c.id for c in categories}
+                self._by_lower_name = {c.name.lower(): c.id for c in categories}
+                self._version = version
+
+            self._checked_at = time.monotonic()
+
+    async def all(self, db: AsyncSession) -> List[CategoryRead]:
+        await self._ensure_fresh(db)
+        return list(self._by_id.values())
+
+    async def get(self, db: AsyncSession, category_id: UUID) -> Optional[CategoryRead]:
+        await self._ensure_fresh(db)
+        return self._by_id.get(category_id)
+
+    async def name_map(self, db: AsyncSession, case_insensitive: bool = False) -> Dict[str, UUID]:
+        """
+        Map of category name to id. With `case_insensitive` the keys are lowercased.
+        """
+        await self._ensure_fresh(db)
+        return self._by_lower_name if case_insensitive else self._by_name
+
+    def clear(self) -> None:
+        self._version = None
+        self._by_id = {}
+        self._by_name = {}
+        self._by_lower_name = {}
+
+    async def invalidate(self, db: AsyncSession) -> None:
+        """
+        Bump the shared version as part of the caller's transaction and drop
+        every worker's copy once that transaction commits.
+        """
+        await db.execute(
+            pg_insert(CacheVersion)
+            .values(name=CACHE_NAME, version=1)
+            .on_conflict_do_update(
+                index_elements=["name"],
+                set_={"version": CacheVersion.version + 1},
+            )
+        )
+        await invalidation_bus.publish(db, [CACHE_NAME])
+
+category_cache = CategoryCache(settings.CATEGORY_CACHE_TTL_SECONDS)
+invalidation_bus.subscribe(CACHE_NAME, lambda key: category_cache.clear())
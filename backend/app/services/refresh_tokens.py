@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Set
+from uuid import UUID
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models import RefreshToken
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class RevocationList:
+    """
+    In-memory set of revoked refresh token hashes.
+
+    Revocations made by this worker are added once they commit; revocations
+    made by other workers are picked up by re-reading rows revoked since the last
+    sync, at most every `REFRESH_TOKEN_REVOCATION_SYNC_SECONDS`.
+    """
+
+    def __init__(self, sync_seconds: float):
+        self.sync_seconds = sync_seconds
+        self._revoked: Set[str] = set()
+        self._synced_until: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def add(self, token_hash: str) -> None:
+        self._revoked.add(token_hash)
+
+    async def preload(self, db: AsyncSession) -> None:
+        await self._sync(db)
+
+    async def is_revoked(self, db: AsyncSession, token_hash: str) -> bool:
+        await self._sync(db)
+        return token_hash in self._revoked
+
+    async def _sync(self, db: AsyncSession) -> None:
+        if time.monotonic() - self._checked_at < self.sync_seconds:
+            return
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.sync_seconds:
+                return
+            now = datetime.utcnow()
+            # Expired tokens are rejected anyway, so they need not be tracked
+            query = select(RefreshToken.token_hash, RefreshToken.revoked_at).where(
+                RefreshToken.revoked_at != None,
+                RefreshToken.expires_at > now,
+            )
+            if self._synced_until is not None:
+                query = query.where(RefreshToken.revoked_at > self._synced_until)
+            result = await db.execute(query)
+            for token_hash, revoked_at in result.all():
+                self._revoked.add(token_hash)
+                if self._synced_until is None or revoked_at > self._synced_until:
+                    self._synced_until = revoked_at
+            self._checked_at = time.monotonic()
+
+revocation_list = RevocationList(settings.REFRESH_TOKEN_REVOCATION_SYNC_SECONDS)
+
+def create_refresh_token(db: AsyncSession, user_id: UUID) -> str:
+    """
+    Store a new refresh token for the user (the caller commits) and return it.
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=hash_token(token),
+        user_id=user_id,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+async def get_valid_refresh_token(db: AsyncSession, token: str) -> Optional[RefreshToken]:
+    token_hash = hash_token(token)
+    if await revocation_list.is_revoked(db, token_hash):
+        return None
+    result = await db.execute(select(RefreshToken).where(RefreshToken.token_hash == token_hash))
+    refresh_token = result.scalars().first()
+    if not refresh_token or refresh_token.revoked_at or refresh_token.expires_at <= datetime.utcnow():
+        return None
+    return refresh_token
+
+# Hashes revoked in the session's transaction, added to the list on commit
+PENDING = "revoked_refresh_tokens"
+
+async def revoke_refresh_tokens(
+    db: AsyncSession, *, token: Optional[str] = None, user_id: Optional[UUID] = None, revoke_all: bool = False
+) -> None:
+    """
+    Revoke one token, every active token of a user, or, only with
+    `revoke_all`, every active token (the caller commits).
+    """
+    if token is None and user_id is None and not revoke_all:
+        raise ValueError("Pass a token or user_id to revoke, or revoke_all=True")
+    query = update(RefreshToken).where(RefreshToken.revoked_at == None)
+    if token is not None:
+        query = query.where(RefreshToken.token_hash == hash_token(token))
+    if user_id is not None:
+        query = query.where(RefreshToken.user_id == user_id)
+    result = await db.execute(query.values(revoked_at=datetime.utcnow()).returning(RefreshToken.token_hash))
+    # A rolled-back revocation must not be rejected by this worker only
+    db.sync_session.info.setdefault(PENDING, set()).update(result.scalars().all())
+
+def _after_commit(session: Session) -> None:
+    for token_hash in session.info.pop(PENDING, ()):
+        revocation_list.add(token_hash)
+
+def _after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING, None)
+
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_soft_rollback", _after_rollback)
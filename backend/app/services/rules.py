@@ -0,0 +1,232 @@
+import re
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models import Rule, RuleField, RuleMatchType, RuleRead, TransactionCreate
+
+class SubstringSearch:
+    """
+    Multi-pattern substring search compiled into one regex. The patterns
+    are laid out as a trie, so at any position the regex engine follows a
+    single branch, and the scan runs in C however many patterns there are.
+    """
+
+    def __init__(self, patterns: Dict[str, List[int]]):
+        # patterns: lowercased pattern -> ids reported when it occurs
+        trie: dict = {}
+        for pattern in patterns:
+            node = trie
+            for ch in pattern:
+                node = node.setdefault(ch, {})
+            node[""] = pattern
+
+        # A match is the longest pattern starting at its position; every
+        # pattern that is a prefix of it occurs there too
+        self._ids: Dict[str, Tuple[int, ...]] = {}
+        for pattern in patterns:
+            node, ids = trie, []
+            for ch in pattern:
+                node = node[ch]
+                if "" in node:
+                    ids.extend(patterns[node[""]])
+            self._ids[pattern] = tuple(ids)
+
+        try:
+            self._regex = re.compile(_trie_regex(trie))
+        except (RecursionError, re.error):
+            # Too deeply nested: a flat alternation, longest first, finds
+            # the same longest match, only slower
+            self._regex = re.compile("|".join(map(re.escape, sorted(patterns, key=len, reverse=True))))
+
+    def search(self, text: str) -> set:
+        search, ids = self._regex.search, self._ids
+        found = set()
+        match = search(text)
+        while match:
+            found.update(ids[match.group()])
+            # Patterns starting inside this match are found from the next position
+            match = search(text, match.start() + 1)
+        return found
+
+def _trie_regex(node: dict) -> str:
+    branches = []
+    for ch, child in node.items():
+        if not ch:
+            continue
+        # A chain of single children is one literal
+        run = ch
+        while len(child) == 1 and "" not in child:
+            ((ch, child),) = child.items()
+            run += ch
+        branches.append(re.escape(run) + _trie_regex(child))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # Greedy: a longer pattern through this node is preferred to the one ending here
+    return f"(?:{body})?" if "" in node else body
+
+# Patterns that cannot share one compiled alternation with others: named
+# groups (names clash), backreferences and conditionals (group numbers
+# shift), and global inline flags (only allowed at the very start)
+_UNCOMBINABLE = re.compile(r"\(\?P[<=]|\\[1-9]|\(\?\(|\(\?[aiLmsux]+\)")
+
+def combinable(pattern: str) -> bool:
+    return not _UNCOMBINABLE.search(pattern)
+
+def compile_rule_pattern(pattern: str) -> re.Pattern:
+    """
+    Compile a regex rule's pattern the way the matcher uses it, alone and,
+    if it qualifies, inside the combined prefilter. Raises `re.error`.
+    """
+    compiled = re.compile(pattern, re.IGNORECASE)
+    if combinable(pattern):
+        re.compile(f"(?:)|(?:{pattern})", re.IGNORECASE)
+    return compiled
+
+class _FieldMatcher:
+    """
+    All text rules that look at one field, compiled together.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[int, RuleRead]]):
+        substrings: Dict[str, List[int]] = {}
+        # Regexes behind the combined prefilter, and those always tried on their own
+        self.filtered: List[Tuple[int, re.Pattern]] = []
+        self.unfiltered: List[Tuple[int, re.Pattern]] = []
+        for index, rule in rules:
+            if rule.match_type == RuleMatchType.REGEX:
+                try:
+                    pattern = re.compile(rule.pattern, re.IGNORECASE)
+                except re.error:
+                    # Saved before validation: it can never match
+                    continue
+                (self.filtered if combinable(rule.pattern) else self.unfiltered).append((index, pattern))
+            else:
+                substrings.setdefault(rule.pattern.lower(), []).append(index)
+
+        self.substrings = SubstringSearch(substrings) if substrings else None
+        # One combined pattern rules out most texts before any single regex runs
+        self.regex_filter = None
+        if self.filtered:
+            try:
+                self.regex_filter = re.compile(
+                    "|".join(f"(?:{p.pattern})" for _, p in self.filtered), re.IGNORECASE
+                )
+            except re.error:
+                self.unfiltered += self.filtered
+                self.filtered = []
+
+    def match(self, text: Optional[str]) -> set:
+        if not text:
+            return set()
+        found = self.substrings.search(text.lower()) if self.substrings else set()
+        for index, pattern in self.unfiltered:
+            if pattern.search(text):
+                found.add(index)
+        if self.regex_filter and self.regex_filter.search(text):
+            found.update(index for index, pattern in self.filtered if pattern.search(text))
+        return found
+
+class RuleMatcher:
+    """
+    A user's categorization rules compiled into one matcher.
+
+    Rules are tried from highest to lowest `priority`; the first rule whose
+    text pattern and amount range (compared against the absolute amount)
+    both match wins. Each field is scanned once per value with all its rules
+    at a time, and memoized, so repeated names and payees are scanned once.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        # Detached copies, so the compiled matcher can outlive the session
+        self.rules = sorted((RuleRead.model_validate(r) for r in rules), key=lambda r: (-r.priority, r.name))
+        self._always: List[int] = []
+        by_field: Dict[RuleField, List[Tuple[int, RuleRead]]] = {RuleField.NAME: [], RuleField.PAYEE: []}
+        for index, rule in enumerate(self.rules):
+            if rule.pattern:
+                by_field[rule.field].append((index, rule))
+            else:
+                self._always.append(index)
+        self._name = _FieldMatcher(by_field[RuleField.NAME])
+        self._payee = _FieldMatcher(by_field[RuleField.PAYEE])
+        self._bounds = [
+            (
+                Decimal(r.min_amount) if r.min_amount is not None else None,
+                Decimal(r.max_amount) if r.max_amount is not None else None,
+            )
+            for r in self.rules
+        ]
+
+    def match_many(
+        self,
+        names: Sequence[Optional[str]],
+        payees: Sequence[Optional[str]],
+        amounts: Sequence[Decimal],
+    ) -> List[Optional[RuleRead]]:
+        """
+        Return the winning rule (or None) for every row of a batch.
+        """
+        name_hits: Dict[Optional[str], set] = {}
+        payee_hits: Dict[Optional[str], set] = {}
+        match_name, match_payee = self._name.match, self._payee.match
+        always = set(self._always)
+        bounds = self._bounds
+        results: List[Optional[RuleRead]] = []
+
+        for name, payee, amount in zip(names, payees, amounts):
+            hits = name_hits.get(name)
+            if hits is None:
+                hits = name_hits[name] = match_name(name)
+            other = payee_hits.get(payee)
+            if other is None:
+                other = payee_hits[payee] = match_payee(payee)
+
+            winner = None
+            if hits or other or always:
+                value = abs(amount)
+                for index in sorted(hits | other | always):
+                    low, high = bounds[index]
+                    if (low is None or value >= low) and (high is None or value <= high):
+                        winner = self.rules[index]
+                        break
+            results.append(winner)
+        return results
+
+    def apply(self, transactions: Sequence[TransactionCreate], payees: Sequence[Optional[str]]) -> None:
+        """
+        Fill in missing category and destination account in place.
+        """
+        if not self.rules:
+            return
+        matches = self.match_many(
+            [t.name for t in transactions], payees, [t.amount for t in transactions]
+        )
+        for transaction, rule in zip(transactions, matches):
+            if rule is None:
+                continue
+            if not transaction.category_id and rule.category_id:
+                transaction.category_id = rule.category_id
+            if not transaction.target_account_id and rule.target_account_id:
+                transaction.target_account_id = rule.target_account_id
+
+_compiled: Dict[UUID, Tuple[tuple, RuleMatcher]] = {}
+
+async def get_rule_matcher(db: AsyncSession, user_id: UUID) -> RuleMatcher:
+    """
+    Load a user's rules and return their compiled matcher, reusing the last
+    compiled one while the rules are unchanged.
+    """
+    result = await db.execute(select(Rule).where(Rule.user_id == user_id))
+    rules = result.scalars().all()
+    fingerprint = tuple(sorted((str(r.id), str(r.updated_at)) for r in rules))
+
+    cached = _compiled.get(user_id)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+
+    matcher = RuleMatcher(rules)
+    _compiled[user_id] = (fingerprint, matcher)
+    return matcher
@@ -0,0 +1,75 @@
+"""
+Pin down what `create_app` registers, so a duplicated router or middleware
+(each one re-runs on every request) fails loudly:
+
+- every route in `app/api/v1/api.py` is mounted exactly once, under the API
+  prefix, next to the app-level routes in `APP_ROUTES`
+- the middleware chain is exactly `MIDDLEWARE`, outermost first
+- a large JSON response is gzipped and a small one is not
+
+Needs no database:
+
+    uv run python -m benchmarks.app_layout
+"""
+import sys
+from collections import Counter
+from typing import List, Set, Tuple
+
+# Outermost first
+MIDDLEWARE = ["MetricsMiddleware", "CORSMiddleware", "CompressionMiddleware", "DisconnectCancelMiddleware"]
+
+APP_ROUTES = {
+    ("GET", "/"),
+    ("GET", "/api/v1/openapi.json"),
+    ("GET", "/docs"),
+    ("GET", "/docs/oauth2-redirect"),
+    ("GET", "/redoc"),
+}
+
+def registered_routes(app) -> List[Tuple[str, str]]:
+    return [(method, route.path) for route in app.routes for method in getattr(route, "methods", ()) if method != "HEAD"]
+
+def main() -> None:
+    from fastapi.testclient import TestClient
+    from app.api.v1.api import api_router
+    from app.core.config import settings
+    from app.main import create_app
+
+    app = create_app()
+    failures: List[str] = []
+
+    routes = registered_routes(app)
+    for (method, path), count in sorted(Counter(routes).items()):
+        if count > 1:
+            failures.append(f"{method} {path}: registered {count} times")
+    expected: Set[Tuple[str, str]] = APP_ROUTES | {
+        (method, settings.API_V1_STR + route.path) for route in api_router.routes for method in route.methods
+    }
+    # Served only with a scrape token
+    if settings.METRICS_ENABLED and settings.METRICS_TOKEN:
+        expected.add(("GET", "/metrics"))
+    for method, path in sorted(expected - set(routes)):
+        failures.append(f"{method} {path}: missing")
+    for method, path in sorted(set(routes) - expected):
+        failures.append(f"{method} {path}: not expected")
+
+    middleware = [m.cls.__name__ for m in app.user_middleware]
+    if middleware != MIDDLEWARE:
+        failures.append(f"middleware {middleware}, expected {MIDDLEWARE}")
+
+    # No `with`: the lifespan (and its database check) does not run
+    client = TestClient(app)
+    large = client.get(app.openapi_url, headers={"Accept-Encoding": "gzip"})
+    if large.headers.get("content-encoding") != "gzip":
+        failures.append(f"{app.openapi_url}: {len(large.content)} bytes of JSON not gzipped")
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    if "content-encoding" in small.headers:
+        failures.append("/: small response compressed")
+
+    print(f"{len(routes)} routes, middleware {' > '.join(middleware)}")
+    if failures:
+        print("\n" + "\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+-- The schema the baseline's init_db left with SQLModel.metadata.create_all,
+-- before Alembic (pg_dump --schema-only). Used by benchmarks/migrations.py.
+
+CREATE TYPE public.transactiontype AS ENUM (
+    'expense',
+    'income',
+    'transfer',
+    'withdraw'
+);
+
+CREATE TYPE public.userrole AS ENUM (
+    'ADMIN',
+    'EDITOR',
+    'READONLY'
+);
+
+CREATE TABLE public.account (
+    name character varying NOT NULL,
+    account_number character varying,
+    bank_name character varying,
+    initial_balance numeric NOT NULL,
+    balance_date date NOT NULL,
+    currency character varying NOT NULL,
+    user_id uuid,
+    category_id uuid,
+    id uuid NOT NULL
+);
+
+CREATE TABLE public.category (
+    name character varying NOT NULL,
+    description character varying,
+    id uuid NOT NULL
+);
+
+CREATE TABLE public.transaction (
+    name character varying NOT NULL,
+    type public.transactiontype,
+    amount numeric NOT NULL,
+    target_account_id uuid,
+    account_id uuid NOT NULL,
+    date date NOT NULL,
+    recurrency jsonb,
+    category_id uuid,
+    id uuid NOT NULL
+);
+
+CREATE TABLE public."user" (
+    username character varying NOT NULL,
+    email character varying NOT NULL,
+    permission public.userrole NOT NULL,
+    label character varying,
+    id uuid NOT NULL,
+    hashed_password character varying NOT NULL
+);
+
+ALTER TABLE ONLY public.account
+    ADD CONSTRAINT account_pkey PRIMARY KEY (id);
+
+ALTER TABLE ONLY public.category
+    ADD CONSTRAINT category_pkey PRIMARY KEY (id);
+
+ALTER TABLE ONLY public.transaction
+    ADD CONSTRAINT transaction_pkey PRIMARY KEY (id);
+
+ALTER TABLE ONLY public."user"
+    ADD CONSTRAINT user_pkey PRIMARY KEY (id);
+
+CREATE UNIQUE INDEX ix_category_name ON public.category USING btree (name);
+
+CREATE UNIQUE INDEX ix_user_email ON public."user" USING btree (email);
+
+CREATE UNIQUE INDEX ix_user_username ON public."user" USING btree (username);
+
+ALTER TABLE ONLY public.account
+    ADD CONSTRAINT account_category_id_fkey FOREIGN KEY (category_id) REFERENCES public.category(id);
+
+ALTER TABLE ONLY public.account
+    ADD CONSTRAINT account_user_id_fkey FOREIGN KEY (user_id) REFERENCES public."user"(id);
+
+ALTER TABLE ONLY public.transaction
+    ADD CONSTRAINT transaction_account_id_fkey FOREIGN KEY (account_id) REFERENCES public.account(id);
+
+ALTER TABLE ONLY public.transaction
+    ADD CONSTRAINT transaction_category_id_fkey FOREIGN KEY (category_id) REFERENCES public.category(id);
+
+ALTER TABLE ONLY public.transaction
+    ADD CONSTRAINT transaction_target_account_id_fkey FOREIGN KEY (target_account_id) REFERENCES public.account(id);
+
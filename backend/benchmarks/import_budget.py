@@ -0,0 +1,100 @@
+"""
+Cold-start import time of `app.main`, measured with `python -X importtime`
+in fresh interpreters, and checked against a fixed budget:
+
+- the median cumulative import time of `app.main` must stay under
+  `--budget-ms`
+- modules that only some endpoints need must not be imported up front;
+  they are loaded on first use
+
+Prints the packages that cost the most, by self time, so a regression
+points at its cause:
+
+    uv run python -m benchmarks.import_budget
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Measured at ~1.7 s under -X importtime on a development laptop; most of it
+# is FastAPI, pydantic and SQLAlchemy themselves
+BUDGET_MS = 2000
+
+# Loaded on first use only
+DEFERRED = (
+    "alembic",  # the one-shot migrate entry point
+    "passlib",  # password hashing: login and user management
+    "dateutil",  # recurrence expansion
+    "app.services.recurrence",
+)
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+def import_once() -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+    """
+    Import `app.main` in a fresh interpreter. Returns {module: (self_us,
+    cumulative_us)} and the deferred modules that got imported anyway.
+    """
+    probe = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return timings, loaded
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Packages to list by self time")
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    by_package: Dict[str, List[float]] = defaultdict(list)
+    loaded = set()
+    for _ in range(args.runs):
+        timings, eager = import_once()
+        loaded.update(eager)
+        totals.append(timings["app.main"][1] / 1000)
+        packages: Dict[str, float] = defaultdict(float)
+        for module, (self_us, _) in timings.items():
+            # app.* by module, everything else by top-level package
+            name = module if module.startswith("app.") or module == "app" else module.split(".")[0]
+            packages[name] += self_us / 1000
+        for name, ms in packages.items():
+            by_package[name].append(ms)
+
+    median = statistics.median(totals)
+    print(f"import app.main: median {median:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    ranked = sorted(by_package.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, samples in ranked[:args.top]:
+        print(f"  {name:<36} {statistics.median(samples):8.1f} ms")
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"import app.main took {median:.0f} ms, budget {args.budget_ms:.0f} ms")
+    for module in sorted(loaded):
+        failures.append(f"{module} is imported by app.main; it should load on first use")
+    if failures:
+        print("\n" + "\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Concurrent load and soak test against a running instance of the app.
+
+Every virtual user logs in as one of the `benchmarks.dataset` users and
+replays dashboard sessions: `/users/me`, categories, account list, account
+balances, transaction pages and both reports, with think time in between.
+The run reports throughput, latency percentiles and errors per endpoint,
+plus connection-pool checkout waits from `/diagnostics/pool`. In soak mode
+it also samples worker memory from `/diagnostics/process` and fails if it
+keeps growing.
+
+Pool and memory figures come from whichever worker answers, so run the
+server with a single worker:
+
+    uv run python -m benchmarks.dataset load --database-uri ... --transactions 1000000
+    DATABASE_URI=... uv run uvicorn app.main:app --port 8000
+    uv run python -m benchmarks.load --concurrency 200 --duration 60
+    uv run python -m benchmarks.load --soak --concurrency 50 --duration 3600
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.dataset import PASSWORD
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        # (seconds since start, latency ms) for every request, for soak windows
+        self.timeline: List[tuple] = []
+        self.started = time.perf_counter()
+
+    def add(self, name: str, elapsed_ms: float, error: Optional[str]) -> None:
+        self.latencies[name].append(elapsed_ms)
+        self.timeline.append((time.perf_counter() - self.started, elapsed_ms))
+        if error:
+            self.errors[name][error] += 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        endpoints = {}
+        total = errors = 0
+        for name, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            failed = sum(self.errors[name].values())
+            total += len(ordered)
+            errors += failed
+            endpoints[name] = {
+                "requests": len(ordered),
+                "errors": failed,
+                "error_kinds": dict(self.errors[name]),
+                "p50_ms": round(percentile(ordered, 0.50), 2),
+                "p90_ms": round(percentile(ordered, 0.90), 2),
+                "p99_ms": round(percentile(ordered, 0.99), 2),
+                "max_ms": round(ordered[-1], 2),
+            }
+        ordered = sorted(latency for _, latency in self.timeline)
+        return {
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "throughput_rps": round(total / duration, 1) if duration else 0.0,
+            "p50_ms": round(percentile(ordered, 0.50), 2),
+            "p99_ms": round(percentile(ordered, 0.99), 2),
+            "endpoints": endpoints,
+        }
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, username: str, args):
+        self.client = client
+        self.recorder = recorder
+        self.username = username
+        self.args = args
+        self.headers: Dict[str, str] = {}
+        self.rng = random.Random(username)
+        self.deadline = float("inf")
+
+    async def call(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        if start >= self.deadline:
+            return None
+        error = None
+        response = None
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            if response.status_code >= 400:
+                error = str(response.status_code)
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        self.recorder.add(name, (time.perf_counter() - start) * 1000, error)
+        if response is not None and response.status_code == 401:
+            self.headers = {}
+        return response if error is None else None
+
+    async def think(self) -> None:
+        if self.args.think > 0 and time.perf_counter() < self.deadline:
+            await asyncio.sleep(self.rng.uniform(0, self.args.think))
+
+    async def login(self) -> bool:
+        response = await self.call(
+            "login", "POST", "/login/access-token", data={"username": self.username, "password": self.args.password}
+        )
+        if response is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def session(self) -> None:
+        if not self.headers and not await self.login():
+            await asyncio.sleep(1)
+            return
+        await self.call("users.me", "GET", "/users/me")
+        await self.think()
+        categories = await self.call("categories.list", "GET", "/categories/")
+        accounts = await self.call("accounts.list", "GET", "/accounts/")
+        account_ids = [a["id"] for a in accounts.json()] if accounts is not None else []
+        for account_id in account_ids[:3]:
+            await self.call("accounts.balance", "GET", f"/accounts/{account_id}/balance")
+        await self.think()
+        for page in range(self.args.pages):
+            await self.call("transactions.page", "GET", "/transactions/", params={"skip": page * 100, "limit": 100})
+            await self.think()
+        if account_ids:
+            report = {"account_id": self.rng.choice(account_ids), "limit": 100}
+            category_ids = [c["id"] for c in categories.json()[:5]] if categories is not None else []
+            await self.call("reports.category", "POST", "/reports/category", json={**report, "category_ids": category_ids})
+            await self.call("reports.type", "POST", "/reports/type", json={**report, "types": ["expense"]})
+        await self.think()
+
+    async def run(self, deadline: float) -> None:
+        self.deadline = deadline
+        # Stagger start so the first wave of logins is not a single burst
+        await asyncio.sleep(self.rng.uniform(0, self.args.ramp_up))
+        while time.perf_counter() < deadline:
+            await self.session()
+
+class Monitor:
+    """
+    Samples pool usage, admission queues (and, in soak mode, worker memory)
+    as an admin.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.headers: Dict[str, str] = {}
+        self.pool_samples: List[Dict[str, Any]] = []
+        self.admission_samples: List[Dict[str, Any]] = []
+        self.memory_samples: List[tuple] = []
+        self.started = time.perf_counter()
+
+    async def login(self) -> None:
+        response = await self.client.post(
+            "/login/access-token", data={"username": self.args.admin_username, "password": self.args.admin_password}
+        )
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def pool(self) -> Dict[str, Any]:
+        response = await self.client.get("/diagnostics/pool", headers=self.headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def admission(self) -> Dict[str, Any]:
+        response = await self.client.get("/diagnostics/admission", headers=self.headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def sample(self) -> None:
+        self.pool_samples.append(await self.pool())
+        self.admission_samples.append(await self.admission())
+        if self.args.soak:
+            response = await self.client.get("/diagnostics/process", headers=self.headers)
+            response.raise_for_status()
+            self.memory_samples.append((time.perf_counter() - self.started, response.json()["rss_bytes"]))
+
+    async def run(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            try:
+                await self.sample()
+            except httpx.HTTPError as e:
+                print(f"monitor: {e}", file=sys.stderr)
+            await asyncio.sleep(self.args.sample_interval)
+
+def pool_report(before: Dict[str, Any], after: Dict[str, Any], samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    checkouts = after["checkouts"] - before["checkouts"]
+    wait_total = after["checkout_wait_total_seconds"] - before["checkout_wait_total_seconds"]
+    return {
+        "size": after["size"],
+        "max_overflow": after["max_overflow"],
+        "checkouts": checkouts,
+        "checkout_timeouts": after["checkout_timeouts"] - before["checkout_timeouts"],
+        "checkout_wait_total_seconds": round(wait_total, 3),
+        "checkout_wait_avg_ms": round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+        "checkout_wait_max_seconds": after["checkout_wait_max_seconds"],
+        "peak_checked_out": max((s["checked_out"] for s in samples), default=0),
+        "peak_overflow": max((s["overflow"] for s in samples), default=0),
+    }
+
+def admission_report(before: Dict[str, Any], after: Dict[str, Any], samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        name: {
+            "limit": status["limit"],
+            "peak_running": max((s[name]["running"] for s in samples), default=0),
+            "peak_waiting": max((s[name]["waiting"] for s in samples), default=0),
+            "rejected": {
+                reason: count - before[name]["rejected"][reason] for reason, count in status["rejected"].items()
+            },
+        }
+        for name, status in after.items()
+    }
+
+def memory_report(samples: List[tuple], recorder: Recorder, windows: int) -> Dict[str, Any]:
+    """
+    Memory growth over the second half of the run (the first half absorbs
+    warm-up: caches, pools, compiled statements) and p99 per time window.
+    """
+    report: Dict[str, Any] = {}
+    if len(samples) >= 4:
+        steady = samples[len(samples) // 2:]
+        xs = [t for t, _ in steady]
+        ys = [rss for _, rss in steady]
+        mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+        denominator = sum((x - mean_x) ** 2 for x in xs) or 1.0
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
+        report = {
+            "rss_start_mb": round(samples[0][1] / 2**20, 1),
+            "rss_end_mb": round(samples[-1][1] / 2**20, 1),
+            "rss_peak_mb": round(max(rss for _, rss in samples) / 2**20, 1),
+            "steady_growth_mb": round((ys[-1] - ys[0]) / 2**20, 1),
+            "steady_slope_mb_per_hour": round(slope * 3600 / 2**20, 2),
+        }
+
+    if recorder.timeline:
+        end = recorder.timeline[-1][0]
+        width = end / windows or 1.0
+        buckets: Dict[int, List[float]] = defaultdict(list)
+        for at, latency in recorder.timeline:
+            buckets[min(int(at / width), windows - 1)].append(latency)
+        report["p99_ms_by_window"] = [round(percentile(sorted(buckets[i]), 0.99), 2) for i in range(windows)]
+    return report
+
+async def run(args) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency + 2, max_keepalive_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=args.base_url.rstrip("/") + args.prefix, limits=limits, timeout=args.timeout) as client:
+        monitor = Monitor(client, args)
+        await monitor.login()
+        recorder = Recorder()
+        pool_before = await monitor.pool()
+        admission_before = await monitor.admission()
+
+        deadline = time.perf_counter() + args.duration
+        users = [
+            VirtualUser(client, recorder, f"user{i % args.users}", args)
+            for i in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(monitor.run(deadline), *(user.run(deadline) for user in users))
+        duration = time.perf_counter() - started
+
+        # The monitor's token may have expired during a long soak
+        await monitor.login()
+        pool_after = await monitor.pool()
+        admission_after = await monitor.admission()
+        document = {
+            "config": {k: v for k, v in vars(args).items() if k not in ("password", "admin_password")},
+            "duration_seconds": round(duration, 1),
+            **recorder.summary(duration),
+            "pool": pool_report(pool_before, pool_after, monitor.pool_samples),
+            "admission": admission_report(admission_before, admission_after, monitor.admission_samples),
+        }
+        if args.soak:
+            document["memory"] = memory_report(monitor.memory_samples, recorder, args.windows)
+        return document
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--prefix", default="/api/v1")
+    parser.add_argument("--concurrency", type=int, default=200, help="Virtual users")
+    parser.add_argument("--users", type=int, default=50, help="Dataset users to log in as (user0..userN-1)")
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--admin-username", default="admin")
+    parser.add_argument("--admin-password", default="admin")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds over which virtual users start")
+    parser.add_argument("--think", type=float, default=0.5, help="Max seconds of think time between steps")
+    parser.add_argument("--pages", type=int, default=2, help="Transaction pages per session")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between pool/memory samples")
+    parser.add_argument("--soak", action="store_true", help="Also track worker memory and latency drift")
+    parser.add_argument("--windows", type=int, default=10, help="Soak report time windows")
+    parser.add_argument("--max-growth-mb", type=float, default=50, help="Soak fails above this steady-state RSS growth")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    document = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+    print(f"{document['requests']} requests in {document['duration_seconds']}s: "
+          f"{document['throughput_rps']} req/s, error rate {document['error_rate']:.2%}, "
+          f"p50 {document['p50_ms']} ms, p99 {document['p99_ms']} ms")
+    print(f"\n{'endpoint':<20} {'requests':>9} {'errors':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, stats in document["endpoints"].items():
+        print(f"{name:<20} {stats['requests']:>9} {stats['errors']:>7} {stats['p50_ms']:>9} "
+              f"{stats['p90_ms']:>9} {stats['p99_ms']:>9} {stats['max_ms']:>9}")
+        for kind, count in stats["error_kinds"].items():
+            print(f"{'':<20} {count:>9} x {kind}")
+    print("\npool: " + ", ".join(f"{k}={v}" for k, v in document["pool"].items()))
+    for name, stats in document["admission"].items():
+        rejected = ", ".join(f"{reason}={count}" for reason, count in stats["rejected"].items())
+        print(f"admission {name}: limit={stats['limit']}, peak running={stats['peak_running']}, "
+              f"peak waiting={stats['peak_waiting']}, rejected {rejected}")
+
+    failures = []
+    if document["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {document['error_rate']:.2%} above {args.max_error_rate:.2%}")
+    if args.soak:
+        memory = document["memory"]
+        print("memory: " + ", ".join(f"{k}={v}" for k, v in memory.items()))
+        if memory.get("steady_growth_mb", 0) > args.max_growth_mb:
+            failures.append(f"RSS grew {memory['steady_growth_mb']} MB after warm-up (limit {args.max_growth_mb} MB)")
+    if failures:
+        print("\n" + "\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measure interactive latency (GET /users/me, in-process, no database) while a
+burst of concurrent bcrypt verifications runs, as during a login storm.
+
+Compares verifying on the event loop (the old behaviour) with the bounded
+executor used by `security.verify_password_async`. The executor keeps
+requests served during the burst, but not at idle latency: its threads
+compete with the event loop for CPU, so p99 rises with the thread count
+when cores are scarce. On one core, idle p99 was ~2.5-5 ms; during the
+burst it was ~7 ms with 1 thread (the default there), ~11 ms with 2 and
+~18 ms with 4, against ~15 s with bcrypt on the event loop.
+
+    uv run python -m benchmarks.login_burst --logins 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from uuid import uuid4
+
+import httpx
+
+from app.api import deps
+from app.core import security
+from app.main import app
+from app.models import User
+from app.models.user import UserRole
+
+async def admitted():
+    # Admission wants a bearer token; this benchmark sends none
+    yield
+
+async def get_me(client: httpx.AsyncClient) -> None:
+    response = await client.get("/api/v1/users/me")
+    assert response.status_code == 200, f"GET /users/me: {response.status_code} {response.text[:200]}"
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def run(mode: str, logins: int, hashed: str) -> list:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await get_me(client)  # warm up
+
+        async def login():
+            if mode == "event-loop":
+                security.verify_password("wrong-password", hashed)
+            elif mode == "executor":
+                await security.verify_password_async("wrong-password", hashed)
+
+        samples = []
+        burst = asyncio.gather(*(login() for _ in range(logins)))
+        deadline = time.perf_counter() + 2.0
+        while not burst.done() or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await get_me(client)
+            samples.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.005)
+        await burst
+        return samples
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=50)
+    args = parser.parse_args()
+
+    user = User(
+        id=uuid4(),
+        username="bench",
+        email="bench@example.com",
+        hashed_password=security.get_password_hash("bench"),
+        permission=UserRole.ADMIN,
+    )
+    app.dependency_overrides[deps.get_current_active_user] = lambda: user
+    app.dependency_overrides[deps.admit_request] = admitted
+
+    print(f"{os.cpu_count()} CPUs, {security.password_executor.max_workers} password hash threads")
+    for mode in ("idle", "event-loop", "executor"):
+        samples = asyncio.run(run(mode, args.logins if mode != "idle" else 0, user.hashed_password))
+        print(
+            f"{mode:<11} requests={len(samples):4d}  "
+            f"p50 {statistics.median(samples):8.2f} ms  p99 {percentile(samples, 99):8.2f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
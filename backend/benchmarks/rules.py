@@ -0,0 +1,142 @@
+"""
+Benchmark the compiled categorization rule matcher on rows whose names and
+payees are all distinct, so memoizing repeated values saves nothing, and
+fail past `--budget-ms`. It first checks that regexes which cannot share
+the combined prefilter (named groups, inline flags, backreferences), and
+substrings that overlap or contain one another, match exactly as they do
+on their own.
+
+    uv run python -m benchmarks.rules --rules 500 --rows 100000
+"""
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from decimal import Decimal
+from uuid import uuid4
+
+from app.models import Rule, RuleField, RuleMatchType
+from app.services.rules import RuleMatcher
+
+def make_rules(count: int, rng: random.Random) -> list:
+    rules = []
+    for i in range(count):
+        kind = i % 10
+        rule = Rule(
+            id=uuid4(),
+            name=f"rule-{i}",
+            field=RuleField.PAYEE if i % 2 else RuleField.NAME,
+            match_type=RuleMatchType.SUBSTRING,
+            pattern=f"merchant{i:04d}",
+            category_id=uuid4(),
+            priority=rng.randint(0, 10),
+        )
+        if kind == 0:
+            rule.match_type = RuleMatchType.REGEX
+            rule.pattern = rf"store\s*#?{i:04d}\b"
+        elif kind == 1:
+            rule.min_amount = Decimal(rng.randint(1, 50))
+            rule.max_amount = rule.min_amount + Decimal(100)
+        rules.append(rule)
+    return rules
+
+def check_regex_rules() -> list:
+    """
+    Rules whose regexes break a naive combined pattern, against texts they
+    must and must not match; returns the mismatches.
+    """
+    patterns = [r"(?P<store>tesco)\s+\d+", r"(?P<store>aldi)\b", r"(?i)uber", r"(\w)\1pay", r"coffee\s*#?\d+"]
+    texts = ["TESCO 123", "aldi market", "Uber trip", "zzpay", "xypay", "Coffee #12", "nothing here"]
+    rules = [
+        Rule(
+            id=uuid4(), name=f"regex-{i}", field=RuleField.NAME, match_type=RuleMatchType.REGEX,
+            pattern=pattern, category_id=uuid4(), priority=len(patterns) - i,
+        )
+        for i, pattern in enumerate(patterns)
+    ]
+    matcher = RuleMatcher(rules)
+    matches = matcher.match_many(texts, [None] * len(texts), [Decimal(1)] * len(texts))
+    failures = []
+    for text, rule in zip(texts, matches):
+        expected = next((p for p in patterns if re.search(p, text, re.IGNORECASE)), None)
+        if (rule.pattern if rule else None) != expected:
+            failures.append(f"{text!r}: matched {rule.pattern if rule else None!r}, expected {expected!r}")
+    return failures
+
+def check_substring_rules() -> list:
+    """
+    Substring rules that overlap, nest and share prefixes, against a plain
+    `in` test per rule; returns the mismatches.
+    """
+    patterns = ["coffee shop", "coffee", "fee", "shop", "hop", "ee s", "offee shopping", "c"]
+    texts = ["COFFEE SHOP", "Coffee shopping", "coffe", "toffee", "hops", "bookshop", "feel", "ee shop", "xyz"]
+    rules = [
+        Rule(
+            id=uuid4(), name=f"substring-{i}", field=RuleField.NAME, match_type=RuleMatchType.SUBSTRING,
+            pattern=pattern, category_id=uuid4(), priority=len(patterns) - i,
+        )
+        for i, pattern in enumerate(patterns)
+    ]
+    matcher = RuleMatcher(rules)
+    failures = []
+    for i in range(len(patterns)):
+        # Each rule in turn as the top priority, so every hit decides a winner once
+        rotated = patterns[i:] + patterns[:i]
+        for rule in rules:
+            rule.priority = len(patterns) - rotated.index(rule.pattern)
+        matcher = RuleMatcher(rules)
+        matches = matcher.match_many(texts, [None] * len(texts), [Decimal(1)] * len(texts))
+        for text, rule in zip(texts, matches):
+            expected = next((p for p in rotated if p in text.lower()), None)
+            if (rule.pattern if rule else None) != expected:
+                failures.append(f"{text!r}: matched {rule.pattern if rule else None!r}, expected {expected!r}")
+    return failures
+
+def make_rows(count: int, rules: int, rng: random.Random) -> tuple:
+    # Every name and payee is distinct (the row number is part of it)
+    def text(i: int) -> str:
+        word = "".join(rng.choices(string.ascii_lowercase, k=6))
+        if rng.random() < 0.1:
+            return f"STORE #{rng.randrange(rules):04d} purchase {word} {i}"
+        return f"{word} merchant{rng.randrange(rules * 2):04d} ref {i}"
+
+    names = [text(i) for i in range(count)]
+    payees = [text(count + i) if rng.random() < 0.7 else None for i in range(count)]
+    amounts = [Decimal(rng.randint(-50000, 50000)) / 100 for _ in range(count)]
+    return names, payees, amounts
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    failures = check_regex_rules() + check_substring_rules()
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    rules = make_rules(args.rules, rng)
+    names, payees, amounts = make_rows(args.rows, args.rules, rng)
+
+    start = time.perf_counter()
+    matcher = RuleMatcher(rules)
+    compiled = time.perf_counter()
+    matches = matcher.match_many(names, payees, amounts)
+    done = time.perf_counter()
+
+    matched = sum(1 for m in matches if m is not None)
+    print(f"rules={args.rules} rows={args.rows} matched={matched}")
+    print(f"compile: {(compiled - start) * 1000:.1f} ms")
+    print(f"match:   {(done - compiled) * 1000:.1f} ms")
+    if (done - start) * 1000 > args.budget_ms:
+        print(f"compile and match took more than {args.budget_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
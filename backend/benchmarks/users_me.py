@@ -0,0 +1,67 @@
+"""
+Benchmark GET /users/me in-process, with the user dependency overridden so
+no database is needed (admission is overridden too, since it needs a bearer
+token), against the bcrypt check the endpoint used to run.
+
+    uv run python -m benchmarks.users_me --requests 200
+"""
+import argparse
+import statistics
+import time
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.core import security
+from app.main import app
+from app.models import User
+from app.models.user import UserRole
+
+async def admitted():
+    # Admission wants a bearer token; this benchmark sends none
+    yield
+
+def get_ok(client: TestClient, url: str) -> None:
+    response = client.get(url)
+    assert response.status_code == 200, f"GET {url}: {response.status_code} {response.text[:200]}"
+
+def time_calls(fn, count: int) -> list:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label: str, samples: list) -> None:
+    print(f"{label:<28} median {statistics.median(samples):8.3f} ms   max {max(samples):8.3f} ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    user = User(
+        id=uuid4(),
+        username="bench",
+        email="bench@example.com",
+        hashed_password=security.get_password_hash("not-the-default"),
+        is_default_password=False,
+        permission=UserRole.ADMIN,
+    )
+    app.dependency_overrides[deps.get_current_active_user] = lambda: user
+    app.dependency_overrides[deps.admit_request] = admitted
+    client = TestClient(app)
+    url = "/api/v1/users/me"
+
+    get_ok(client, url)  # warm up
+    report("GET /users/me", time_calls(lambda: get_ok(client, url), args.requests))
+    # What every request paid before the flag was stored on the row
+    report("bcrypt verify (old path)", time_calls(
+        lambda: security.verify_password(security.DEFAULT_PASSWORD, user.hashed_password),
+        max(args.requests // 20, 5),
+    ))
+
+if __name__ == "__main__":
+    main()